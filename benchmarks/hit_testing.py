@@ -0,0 +1,94 @@
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from pylame.components import LameUI, Panel, Button, Sizer
+
+
+def linear_get_component_at(panel, mouse_x, mouse_y):
+    # the scan Panel.get_component_at did before the spatial index
+    pos_x, pos_y = panel.get_abs_pos()
+
+    rect = pygame.Rect(pos_x, pos_y, panel.size[0], panel.size[1])
+    if not rect.collidepoint(mouse_x, mouse_y):
+        return None
+
+    for comp in panel.components:
+        pos_x, pos_y = comp.get_abs_pos()
+        comp_w, comp_h = comp.size
+
+        rect = pygame.Rect(pos_x, pos_y, comp_w, comp_h)
+
+        if rect.collidepoint(mouse_x, mouse_y):
+            if isinstance(comp, Panel):
+                return linear_get_component_at(comp, mouse_x, mouse_y)
+            return comp
+
+    return panel
+
+
+def build_tiles(rows, cols, tile_size=16):
+    width, height = cols*tile_size, rows*tile_size
+    lameui = LameUI((width, height), (0, 0), bg_color=(22, 22, 22))
+
+    for _ in range(rows):
+        row = Panel((width, tile_size), (0, 0))
+        row.set_direction(Sizer.HORIZONTAL)
+        for _ in range(cols):
+            row.add(Button((tile_size, tile_size), (0, 0), (100, 100, 100)))
+        lameui.add(row)
+
+    lameui.update()
+    return lameui
+
+
+def build_list(count, row_height=4):
+    lameui = LameUI((200, count*row_height), (0, 0), bg_color=(22, 22, 22))
+    for _ in range(count):
+        lameui.add(Button((200, row_height), (0, 0), (100, 100, 100)))
+
+    lameui.update()
+    return lameui
+
+
+def bench(name, lameui, queries):
+    width, height = lameui.size
+    points = [(random.randrange(width), random.randrange(height))
+              for _ in range(queries)]
+
+    # the first queries build the indexes, keep that out of the timings
+    for x, y in points:
+        lameui.get_component_at(x, y)
+
+    start = time.perf_counter()
+    for x, y in points:
+        linear_get_component_at(lameui, x, y)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for x, y in points:
+        lameui.get_component_at(x, y)
+    indexed = time.perf_counter() - start
+
+    for x, y in points[:100]:
+        assert lameui.get_component_at(x, y) is linear_get_component_at(lameui, x, y)
+
+    print(f"{name:<24} linear {linear/queries*1e6:9.2f} us/query"
+          f"   indexed {indexed/queries*1e6:7.2f} us/query"
+          f"   x{linear/indexed:.1f}")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    pygame.init()
+
+    for count in (100, 1000, 5000):
+        bench(f"list {count}", build_list(count), 2000)
+
+    for rows, cols in ((10, 10), (40, 50), (100, 100)):
+        bench(f"tiles {rows}x{cols}", build_tiles(rows, cols), 2000)
+
+    pygame.quit()
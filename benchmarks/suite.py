@@ -0,0 +1,590 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from pylame import surfaces
+from pylame.components import LameUI, Panel, Button, Slider, TextInput, Text, Sizer
+from pylame.fonts import text_cache
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class MousePath:
+    # stands in for pygame.mouse.get_pos, which the dummy driver never moves
+    def __init__(self, points):
+        self.points = points
+        self.i = 0
+
+    def __call__(self):
+        point = self.points[self.i]
+        self.i = (self.i + 1) % len(self.points)
+        return point
+
+
+def time_case(func, repeat, number, setup=None, teardown=None):
+    samples = []
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if teardown is not None:
+            teardown()
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def stack_columns(widgets, column_size=(128, 768)):
+    # widgets top to bottom in as many panels of column_size as they need
+    columns = []
+    used = column_size[1]
+    for widget in widgets:
+        height = widget.size[1]
+        if used + height > column_size[1]:
+            columns.append(Panel(column_size, (0, 0)))
+            used = 0
+        columns[-1].add(widget)
+        used += height
+    return columns
+
+
+def build_grid(widgets, column_size=(128, 768)):
+    # the widgets in columns side by side on a screen at least 1024x768
+    # and wide enough for all of them, so culling skips none
+    columns = stack_columns(widgets, column_size)
+    size = (max(1024, len(columns)*column_size[0]), column_size[1])
+    lameui = LameUI(size, (0, 0), bg_color=(22, 22, 22))
+    panel = Panel(size, (0, 0))
+    panel.set_direction(Sizer.HORIZONTAL)
+    panel.add_many(columns)
+    lameui.add(panel)
+    return lameui
+
+
+def build_buttons(count):
+    # 2000 buttons still fit on a 1408x768 screen
+    return build_grid([Button((120, 4), (0, 0), (100, 100, 100), text=str(i)) for i in range(count)])
+
+
+def build_nested(depth, children=4):
+    # each panel is exactly as much shorter than its parent as the buttons
+    # above it take, so every level stays inside the viewport and none of
+    # it is culled, up to depth 50
+    lameui = LameUI((1024, 768), (0, 0), bg_color=(22, 22, 22))
+    parent = lameui
+    leaves = []
+    button_h = 3
+    for d in range(depth):
+        panel = Panel((1000 - d*10, 700 - d*children*button_h), (0, 0), (40, 40, 40))
+        for i in range(children):
+            button = Button((40, button_h), (0, 0), (100, 100, 100), text=str(i), font_size=8)
+            panel.add(button)
+            leaves.append(button)
+        parent.add(panel)
+        parent = panel
+    return lameui, leaves
+
+
+def build_widgets(count):
+    lameui = LameUI((1024, 768), (0, 0), bg_color=(22, 22, 22))
+    sliders = Panel((512, 768), (0, 0))
+    inputs = Panel((512, 768), (0, 0))
+    lameui.set_direction(Sizer.HORIZONTAL)
+    for i in range(count):
+        sliders.add(Slider((400, 6), (0, 0), min_value=0,
+                    max_value=255, start_value=i % 256))
+        inputs.add(TextInput((400, 6), (0, 0), text=str(i)))
+    lameui.add(sliders)
+    lameui.add(inputs)
+    return lameui, sliders.components, inputs.components
+
+
+def make_widget(i):
+    kind = i % 4
+    if kind == 0:
+        return Button((120, 20), (0, 0), (100, 100, 100), text=str(i))
+    if kind == 1:
+        return Slider((120, 10), (0, 0), min_value=0, max_value=255, start_value=i % 256)
+    if kind == 2:
+        return TextInput((120, 20), (0, 0), text=str(i))
+    return Text(str(i), 16)
+
+
+@benchmark("panel_add")
+def bench_panel_add(sizes):
+    cases = {}
+    for count in sizes["buttons"]:
+        def build(count=count):
+            build_buttons(count).update()
+        cases[f"panel_add[buttons={count}]"] = (build, None)
+    return cases
+
+
+@benchmark("build_screen")
+def bench_build_screen(sizes):
+    # mixed widgets built into columns, then the first layout and paint
+    cases = {}
+    for count in sizes["buttons"]:
+        def build(count=count):
+            lameui = build_grid([make_widget(i) for i in range(count)])
+            lameui.update()
+        cases[f"build_screen[widgets={count}]"] = (build, None)
+    return cases
+
+
+@benchmark("calc_pos")
+def bench_calc_pos(sizes):
+    cases = {}
+    for count in sizes["buttons"]:
+        lameui = build_buttons(count)
+        lameui.update()
+
+        def calc_pos(columns=lameui.components[0].components):
+            for column in columns:
+                column.sizer.calc_pos()
+        cases[f"calc_pos[buttons={count}]"] = (calc_pos, None)
+    return cases
+
+
+@benchmark("layout")
+def bench_layout(sizes):
+    cases = {}
+    for depth in sizes["depth"]:
+        lameui, leaves = build_nested(depth)
+        lameui.update()
+        labels = ["a", "bb"]
+
+        def relayout(lameui=lameui, leaf=leaves[-1]):
+            labels.reverse()
+            leaf.text.set_text(labels[0])
+            lameui.update()
+        cases[f"layout[depth={depth}]"] = (relayout, None)
+    return cases
+
+
+@benchmark("process_mouse_pos")
+def bench_process_mouse_pos(sizes):
+    cases = {}
+    get_pos = pygame.mouse.get_pos
+
+    def restore():
+        pygame.mouse.get_pos = get_pos
+
+    for count in sizes["buttons"]:
+        lameui = build_buttons(count)
+        lameui.update()
+        # sweep down the column so the hovered button changes every call
+        points = [(60, y) for y in range(0, min(count*4, 768), 3)]
+        mouse = MousePath(points)
+
+        def process(lameui=lameui):
+            lameui.process_mouse_pos()
+
+        def setup(mouse=mouse):
+            pygame.mouse.get_pos = mouse
+        cases[f"process_mouse_pos[buttons={count}]"] = (process, setup, restore)
+
+        idle_mouse = MousePath([(1000, 700)])
+
+        def setup_idle(mouse=idle_mouse):
+            pygame.mouse.get_pos = mouse
+        cases[f"process_mouse_pos_idle[buttons={count}]"] = (process, setup_idle, restore)
+    return cases
+
+
+@benchmark("handle_events")
+def bench_handle_events(sizes):
+    cases = {}
+    for count in sizes["widgets"]:
+        lameui, sliders, inputs = build_widgets(count)
+        lameui.update()
+        target = inputs[0].get_abs_rect().center
+
+        events = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=target, button=1),
+                  pygame.event.Event(pygame.MOUSEBUTTONUP, pos=target, button=1)]
+        for i in range(sizes["motion"]):
+            events.append(pygame.event.Event(
+                pygame.MOUSEMOTION, pos=(i % 1024, i % 768), rel=(1, 1), buttons=(0, 0, 0)))
+        events.append(pygame.event.Event(pygame.TEXTINPUT, text="a"))
+        events.append(pygame.event.Event(
+            pygame.KEYDOWN, key=pygame.K_BACKSPACE, mod=0, unicode="", scancode=0))
+        events.append(pygame.event.Event(
+            pygame.KEYUP, key=pygame.K_BACKSPACE, mod=0, unicode="", scancode=0))
+
+        def handle(lameui=lameui, events=events):
+            lameui.handle_events(events)
+        cases[f"handle_events[widgets={count},motion={sizes['motion']}]"] = (handle, None)
+    return cases
+
+
+@benchmark("draw_to")
+def bench_draw_to(sizes):
+    cases = {}
+    screen = pygame.display.get_surface()
+    for count in sizes["widgets"]:
+        lameui, sliders, inputs = build_widgets(count)
+        lameui.draw_to(screen)
+        values = [0.25, 0.75]
+
+        def draw_full(lameui=lameui, slider=sliders[0]):
+            values.reverse()
+            slider.value = values[0]
+            slider.invalidate()
+            lameui.draw_to(screen)
+
+        def draw_dirty(lameui=lameui, slider=sliders[0]):
+            values.reverse()
+            slider.value = values[0]
+            slider.invalidate()
+            lameui.draw_to(screen, dirty_rects=True)
+
+        def draw_idle(lameui=lameui):
+            lameui.draw_to(screen, dirty_rects=True)
+
+        cases[f"draw_to_full[widgets={count}]"] = (draw_full, None)
+        cases[f"draw_to_dirty[widgets={count}]"] = (draw_dirty, None)
+        cases[f"draw_to_idle[widgets={count}]"] = (draw_idle, None)
+    return cases
+
+
+@benchmark("chrome")
+def bench_chrome(sizes):
+    # repaint of rounded widgets, a toolbar of identical buttons toggling
+    # hover and a large rounded panel with a slider
+    cases = {}
+    for count in sizes["widgets"]:
+        lameui = LameUI((1024, 768), (0, 0), bg_color=(22, 22, 22))
+        toolbar = Panel((1024, 768), (0, 0), (40, 40, 40), border_radius=16)
+        toolbar.set_direction(Sizer.HORIZONTAL)
+        buttons = [Button((120, 40), (0, 0), (70, 70, 70), text="tool", border_radius=10)
+                   for _ in range(count)]
+        toolbar.add_many(buttons)
+        slider = Slider((600, 24), (0, 0))
+        toolbar.add(slider)
+        lameui.add(toolbar)
+        lameui.update()
+
+        def repaint(lameui=lameui, buttons=buttons, slider=slider):
+            for button in buttons:
+                if button.hovered:
+                    button.on_hover_leave()
+                else:
+                    button.on_hover_enter()
+            slider.set_value(1 - slider.get_value())
+            lameui.update()
+        cases[f"chrome[buttons={count}]"] = (repaint, None)
+    return cases
+
+
+@benchmark("convert")
+def bench_convert(sizes):
+    # full repaint and blit of opaque widgets, with surfaces in pygame's
+    # SRCALPHA format and in the display format
+    cases = {}
+    screen = pygame.display.get_surface()
+    for count in sizes["widgets"]:
+        for enabled in (False, True):
+            surfaces.set_convert(enabled)
+            text_cache.clear()
+            lameui = LameUI((1024, 768), (0, 0), bg_color=(22, 22, 22))
+            panel = Panel((1024, 768), (0, 0), (40, 40, 40))
+            widgets = [make_widget(i) for i in range(count)]
+            panel.add_many(widgets)
+            lameui.add(panel)
+            lameui.draw_to(screen)
+
+            def draw(lameui=lameui, widgets=widgets, enabled=enabled):
+                # surfaces are reallocated when their format no longer
+                # matches the setting, keep it for the whole frame
+                surfaces.set_convert(enabled)
+                for widget in widgets:
+                    widget.invalidate()
+                lameui.draw_to(screen)
+                surfaces.set_convert(False)
+            cases[f"convert[widgets={count},convert={'on' if enabled else 'off'}]"] = (draw, None)
+        surfaces.set_convert(False)
+        text_cache.clear()
+    return cases
+
+
+@benchmark("frozen")
+def bench_frozen(sizes):
+    # a static form next to a slider that changes every frame, with and
+    # without freezing the form, and the surface bytes the form keeps
+    cases = {}
+    screen = pygame.display.get_surface()
+    for count in sizes["widgets"]:
+        for frozen in (False, True):
+            lameui = LameUI((1024, 768), (0, 0), bg_color=(22, 22, 22))
+            lameui.set_direction(Sizer.HORIZONTAL)
+            form = Panel((800, 768), (0, 0), (40, 40, 40), frozen=frozen)
+            form.add_many(make_widget(i) for i in range(count))
+            slider = Slider((200, 20), (0, 0))
+            lameui.add(form)
+            lameui.add(slider)
+            lameui.draw_to(screen)
+            values = [0.25, 0.75]
+
+            def draw(lameui=lameui, slider=slider):
+                values.reverse()
+                slider.set_value(values[0])
+                lameui.draw_to(screen, dirty_rects=True)
+
+            def change(lameui=lameui, widget=form.components[0]):
+                # a change inside the form repaints all of it when frozen
+                widget.invalidate()
+                lameui.draw_to(screen, dirty_rects=True)
+
+            label = f"widgets={count},frozen={'on' if frozen else 'off'}"
+            cases[f"frozen_sibling[{label}]"] = (draw, None)
+            cases[f"frozen_change[{label}]"] = (change, None)
+            cases[f"frozen_bytes[{label}]"] = {
+                "surface_bytes": get_surface_bytes(form, set()),
+            }
+    return cases
+
+
+@benchmark("overflow")
+def bench_overflow(sizes):
+    # repaint of a panel whose children mostly lie below its bottom edge
+    cases = {}
+    screen = pygame.display.get_surface()
+    for count in sizes["buttons"]:
+        lameui = LameUI((1024, 768), (0, 0), bg_color=(22, 22, 22))
+        panel = Panel((1024, 768), (0, 0))
+        buttons = [Button((120, 20), (0, 0), (100, 100, 100), text=str(i)) for i in range(count)]
+        panel.add_many(buttons)
+        lameui.add(panel)
+        lameui.draw_to(screen)
+
+        def draw(lameui=lameui, buttons=buttons):
+            for button in buttons:
+                button.invalidate()
+            lameui.draw_to(screen)
+        cases[f"overflow[buttons={count}]"] = (draw, None)
+    return cases
+
+
+@benchmark("redraw_count")
+def bench_redraw_count(sizes):
+    # not a timing: redraw calls per frame on nested trees, where the
+    # old layout repainted each level once per ancestor
+    counts = {}
+    for depth in sizes["depth"]:
+        lameui, leaves = build_nested(depth)
+        calls = {"n": 0}
+        patched = []
+        for cls in (Panel, Button, Text):
+            redraw = cls.redraw
+
+            def counted(self, redraw=redraw):
+                calls["n"] += 1
+                return redraw(self)
+            cls.redraw = counted
+            patched.append((cls, redraw))
+
+        lameui.update()
+        first = calls["n"]
+        calls["n"] = 0
+        leaves[-1].text.set_text("changed")
+        lameui.update()
+        change = calls["n"]
+
+        for cls, redraw in patched:
+            cls.redraw = redraw
+
+        counts[f"redraw_count[depth={depth}]"] = {
+            "first_frame": first,
+            "deep_change": change,
+            # panel, buttons and their texts per level, plus the root
+            "components": depth*9 + 1,
+        }
+    return counts
+
+
+def get_surface_bytes(component, seen):
+    # pixels owned by the tree, shared text renders are counted once
+    total = 0
+    surface = getattr(component, "surface", None)
+    if surface is not None and id(surface) not in seen:
+        seen.add(id(surface))
+        total += surface.get_pitch()*surface.get_height()
+    for child in getattr(component, "components", ()):
+        total += get_surface_bytes(child, seen)
+    return total
+
+
+@benchmark("memory")
+def bench_memory(sizes):
+    # not a timing: bytes per widget for a built and painted screen, python
+    # objects from tracemalloc and pixels of the surfaces in the tree
+    counts = {}
+    count = sizes["memory"]
+    builders = {
+        "Button": lambda i: Button((120, 20), (0, 0), (100, 100, 100), text=str(i % 10)),
+        "Slider": lambda i: Slider((120, 10), (0, 0)),
+        "TextInput": lambda i: TextInput((120, 20), (0, 0), text=str(i % 10)),
+        "Text": lambda i: Text(str(i % 10), 16),
+        "mixed": make_widget,
+    }
+    for name, make in builders.items():
+        lameui = LameUI((1024, 768), (0, 0))
+        panel = Panel((1024, 768), (0, 0))
+        panel.set_direction(Sizer.HORIZONTAL)
+        lameui.add(panel)
+        # warm the font and text caches outside the measurement
+        panel.add_many(stack_columns(make(i) for i in range(20)))
+        lameui.update()
+        panel.components.clear()
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        widgets = [make(i) for i in range(count)]
+        created = tracemalloc.get_traced_memory()[0]
+        seen = set()
+        created_surface_bytes = sum(get_surface_bytes(widget, seen) for widget in widgets)
+        # a screen of columns at a time, every widget is painted once
+        # and keeps its surfaces
+        columns = stack_columns(widgets)
+        per_screen = 1024 // 128
+        for start in range(0, len(columns), per_screen):
+            panel.components.clear()
+            panel.add_many(columns[start:start + per_screen])
+            lameui.update()
+        painted = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        seen = set()
+        surface_bytes = sum(get_surface_bytes(widget, seen) for widget in widgets)
+        counts[f"memory[{name},widgets={count}]"] = {
+            "python_bytes_per_widget": round((created - before) / count),
+            "python_bytes_per_widget_painted": round((painted - before) / count),
+            "surface_bytes_per_widget_created": round(created_surface_bytes / count),
+            "surface_bytes_per_widget": round(surface_bytes / count),
+        }
+    return counts
+
+
+SIZES = {
+    "quick": {"buttons": [100, 500], "depth": [5, 20], "widgets": [50], "motion": 200, "memory": 2000},
+    "full": {"buttons": [100, 1000, 2000], "depth": [5, 20, 50], "widgets": [50, 500], "motion": 1000, "memory": 20000},
+}
+
+
+def run(names, sizes, repeat, number):
+    results = {}
+    for name in names:
+        cases = BENCHMARKS[name](sizes)
+        for case, value in cases.items():
+            if isinstance(value, dict):
+                results[case] = value
+                print(f"{case:<48} {value}")
+                continue
+
+            # (func, setup) or (func, setup, teardown)
+            func, *hooks = value
+            stats = time_case(func, repeat, number, *hooks)
+            results[case] = stats
+            print(f"{case:<48} median {stats['median']*1e6:12.2f} us")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print()
+    print(f"{'case':<48} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for case, stats in results.items():
+        base = baseline.get(case)
+        if base is None or "median" not in stats or "median" not in base:
+            continue
+        ratio = stats["median"] / base["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(case)
+        print(f"{case:<48} {base['median']*1e6:10.2f}us {stats['median']*1e6:10.2f}us"
+              f" {ratio:8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="headless pylame benchmarks")
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--size", choices=list(SIZES), default="quick")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--output", help="write results to this json file")
+    parser.add_argument("--baseline", help="json file from an earlier --output run")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown ratio above 1 counted as a regression")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name}")
+
+    pygame.init()
+    pygame.display.set_mode((1024, 768))
+
+    names = args.benchmarks or list(BENCHMARKS)
+    results = run(names, SIZES[args.size], args.repeat, args.number)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "platform": platform.platform(),
+            "size": args.size,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s)")
+            status = 1
+
+    pygame.quit()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,26 +48,23 @@ def handle_close_button(button):
         run = False
 
 
-button1.on_press = rand_title_color
-close_button.on_press = handle_close_button
+button1.on_click.connect(rand_title_color)
+close_button.on_click.connect(handle_close_button)
 
 
 while run:
 
-    for event in pygame.event.get():
+    for event in lameui.handle_events(pygame.event.get()):
         if event.type == pygame.QUIT:
             run = False
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 run = False
-        else:
-            pygame.event.post(event)
 
-    lameui.handle_events()
     lameui.process_mouse_pos()
-    lameui.draw_to(screen)
+    rects = lameui.draw_to(screen, dirty_rects=True)
 
-    pygame.display.update()
+    pygame.display.update(rects)
     clock.tick(FPS)
 
 pygame.quit()
@@ -1,5 +1,6 @@
 import pygame
 from pylame.components import LameUI, Text, Alignment, Slider
+from pylame.signals import bind
 
 window_width, window_height = 1024, 768
 
@@ -36,11 +37,15 @@ lameui.add(r_slider)
 lameui.add(g_slider)
 lameui.add(b_slider)
 
+# the title is recolored once per frame, and only when a slider moved
+bind((r_slider, g_slider, b_slider), title.set_font_color,
+     lambda r, g, b: (r, g, b))
+
 
 run = True
 while run:
 
-    for event in pygame.event.get():
+    for event in lameui.handle_events(pygame.event.get()):
         if event.type == pygame.QUIT:
             run = False
 
@@ -48,22 +53,11 @@ while run:
             if event.key == pygame.K_ESCAPE:
                 run = False
 
-        else:
-            pygame.event.post(event)
-
-    lameui.handle_events()
-
-    title_color = (r_slider.get_value(),
-                   g_slider.get_value(), b_slider.get_value())
-
-    if title_color != title.font_color:
-        title.set_font_color(title_color)
-
     lameui.process_mouse_pos()
 
-    lameui.draw_to(screen)
+    rects = lameui.draw_to(screen, dirty_rects=True)
 
-    pygame.display.update()
+    pygame.display.update(rects)
     clock.tick(FPS)
 
 pygame.quit()
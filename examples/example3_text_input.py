@@ -27,26 +27,20 @@ dt = 0
 run = True
 while run:
 
-    for event in pygame.event.get():
+    for event in lameui.handle_events(pygame.event.get()):
         if event.type == pygame.QUIT:
             run = False
 
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 run = False
-            else:
-                pygame.event.post(event)
 
-        else:
-            pygame.event.post(event)
-
-    lameui.handle_events()
     lameui.process_mouse_pos()
     lameui.process(dt)
 
-    lameui.draw_to(screen)
+    rects = lameui.draw_to(screen, dirty_rects=True)
 
-    pygame.display.update()
+    pygame.display.update(rects)
     dt = clock.tick(FPS)
 
 pygame.quit()
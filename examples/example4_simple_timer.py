@@ -6,7 +6,6 @@ window_width, window_height = 1024, 768
 pygame.init()
 screen = pygame.display.set_mode(
     (window_width, window_height), pygame.RESIZABLE)
-clock = pygame.time.Clock()
 FPS = 60
 
 
@@ -15,6 +14,8 @@ btn_color = (55, 55, 55)
 
 timer = 0
 counting = False
+last_tick = 0
+tick_timer = None
 
 
 lameui = LameUI((window_width, window_height), (0, 0),
@@ -33,67 +34,61 @@ lameui.add(stop_button)
 lameui.add(reset_button)
 
 
+def ms_to_format_str(ms):
+    ss = int((ms % 1000)/10)
+    s = int((ms/1000) % 60)
+    m = int((ms/(1000*60)) % 60)
+    h = int((ms/(1000*60*60)) % 24)
+
+    return f"{h:02d}:{m:02d}:{s:02d}.{ss:02d}"
+
+
+def update_timer():
+    global timer, last_tick
+    now = pygame.time.get_ticks()
+    timer += now - last_tick
+    last_tick = now
+    timer_text.set_text(ms_to_format_str(timer))
+
+
 def on_press_start(button):
-    global counting
-    if button == pygame.BUTTON_LEFT:
+    global counting, last_tick, tick_timer
+    if button == pygame.BUTTON_LEFT and not counting:
         counting = True
+        last_tick = pygame.time.get_ticks()
+        # the loop only wakes up for this timer while counting
+        tick_timer = lameui.set_timer(10, update_timer, repeat=True)
 
 
 def on_press_stop(button):
     global counting
-    if button == pygame.BUTTON_LEFT:
+    if button == pygame.BUTTON_LEFT and counting:
+        update_timer()
+        tick_timer.cancel()
         counting = False
 
 
 def on_press_reset(button):
-    global timer
+    global timer, last_tick
     if button == pygame.BUTTON_LEFT:
         timer = 0
+        last_tick = pygame.time.get_ticks()
+        timer_text.set_text(ms_to_format_str(timer))
 
 
-start_button.on_press = on_press_start
-stop_button.on_press = on_press_stop
-reset_button.on_press = on_press_reset
+start_button.on_click.connect(on_press_start)
+stop_button.on_click.connect(on_press_stop)
+reset_button.on_click.connect(on_press_reset)
 
+timer_text.set_text(ms_to_format_str(timer))
 
-def ms_to_format_str(ms):
-    ss = int((ms % 1000)/10)
-    s = int((ms/1000) % 60)
-    m = int((ms/(1000*60)) % 60)
-    h = int((ms/(1000*60*60)) % 24)
-
-    return f"{h:02d}:{m:02d}:{s:02d}.{ss:02d}"
-
-
-dt = 0
-run = True
-while run:
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run = False
-
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                run = False
-            else:
-                pygame.event.post(event)
-
-        else:
-            pygame.event.post(event)
-
-    timer_text.set_text(ms_to_format_str(timer))
-
-    if counting:
-        timer += dt
 
-    lameui.handle_events()
-    lameui.process_mouse_pos()
-    lameui.process(dt)
+def on_event(event):
+    if event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_ESCAPE:
+            lameui.stop()
 
-    lameui.draw_to(screen)
 
-    pygame.display.update()
-    dt = clock.tick(FPS)
+lameui.run(screen, FPS, on_event)
 
 pygame.quit()
@@ -0,0 +1,64 @@
+import pygame
+from pylame.components import LameUI, Alignment, Button, ScrollPanel, Text
+
+
+window_width, window_height = 1024, 768
+pygame.init()
+screen = pygame.display.set_mode(
+    (window_width, window_height), pygame.RESIZABLE)
+clock = pygame.time.Clock()
+FPS = 60
+
+
+background_color = (22, 22, 22)
+row_color = (55, 55, 55)
+
+lines = [f"log line {i}" for i in range(100_000)]
+
+
+lameui = LameUI((window_width, window_height), (0, 0),
+                bg_color=background_color, name="lameui")
+lameui.align(Alignment.CENTER)
+
+selected_text = Text("click a row", 24, pos=(0, -20))
+
+
+def make_row(size):
+    row = Button(size, (0, 0), row_color, font_size=18)
+    row.on_click.connect(lambda button: on_press_row(row, button))
+    return row
+
+
+def bind_row(row, line, index):
+    row.text.set_text(line)
+
+
+def on_press_row(row, button):
+    if button == pygame.BUTTON_LEFT:
+        selected_text.set_text(row.text.text)
+
+
+log_panel = ScrollPanel((600, 500), (0, 0), 30, make_row, bind_row,
+                        data=lines, bg_color=(40, 40, 40))
+
+lameui.add(selected_text)
+lameui.add(log_panel)
+
+run = True
+while run:
+
+    for event in lameui.handle_events(pygame.event.get()):
+        if event.type == pygame.QUIT:
+            run = False
+
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                run = False
+
+    lameui.process_mouse_pos()
+    rects = lameui.draw_to(screen, dirty_rects=True)
+
+    pygame.display.update(rects)
+    clock.tick(FPS)
+
+pygame.quit()
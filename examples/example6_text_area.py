@@ -0,0 +1,61 @@
+import pygame
+from pylame.components import LameUI, Alignment, Button, TextArea
+
+
+window_width, window_height = 1024, 768
+pygame.init()
+screen = pygame.display.set_mode(
+    (window_width, window_height), pygame.RESIZABLE)
+FPS = 60
+
+
+background_color = (22, 22, 22)
+btn_color = (55, 55, 55)
+
+config = "\n".join(f"option_{i} = {i*7 % 100}" for i in range(5000))
+
+
+lameui = LameUI((window_width, window_height), (0, 0),
+                bg_color=background_color, name="lameui")
+lameui.align(Alignment.CENTER)
+
+editor = TextArea((700, 400), (0, 0), bg_color=(40, 40, 40), text=config)
+
+log = TextArea((700, 150), (0, 10), bg_color=(30, 30, 30),
+               font_size=14, read_only=True)
+log.follow = True
+
+log_button = Button((200, 40), (0, 10), btn_color, text="log line")
+
+lameui.add(editor)
+lameui.add(log)
+lameui.add(log_button)
+
+lines_logged = 0
+
+
+def log_line():
+    global lines_logged
+    lines_logged += 1
+    line, col = editor.caret
+    log.append(f"{lines_logged}: caret at line {line + 1}, column {col + 1}")
+
+
+def on_press_log(button):
+    if button == pygame.BUTTON_LEFT:
+        log_line()
+
+
+log_button.on_click.connect(on_press_log)
+lameui.set_timer(1000, log_line, repeat=True)
+
+
+def on_event(event):
+    if event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_ESCAPE:
+            lameui.stop()
+
+
+lameui.run(screen, FPS, on_event)
+
+pygame.quit()
@@ -0,0 +1,70 @@
+import pygame
+from pylame import loader
+
+
+window_width, window_height = 1024, 768
+pygame.init()
+screen = pygame.display.set_mode(
+    (window_width, window_height), pygame.RESIZABLE)
+clock = pygame.time.Clock()
+FPS = 60
+
+
+btn_color = (55, 55, 55)
+
+settings_screen = {
+    "type": "LameUI",
+    "size": [window_width, window_height],
+    "bg_color": [22, 22, 22],
+    "name": "settings",
+    "align": "center",
+    "children": [
+        {"type": "Text", "text": "settings", "font_size": 32},
+        {"type": "Panel", "size": [600, 200], "pos": [0, 20], "bg_color": [55, 55, 55],
+         "border_radius": 12, "align": "center", "space_between": 10,
+         "children": [
+             {"type": "Slider", "size": [400, 10], "name": "volume",
+              "min_value": 0, "max_value": 100, "start_value": 50},
+             {"type": "TextInput", "size": [400, 30], "name": "player",
+              "bg_color": [88, 88, 88], "text": "player one"},
+         ]},
+        {"type": "Button", "size": [200, 40], "pos": [0, 10], "color": btn_color,
+         "text": "reopen", "name": "reopen"},
+    ],
+}
+
+
+def open_screen():
+    # the first call parses and builds, later ones clone the built tree
+    lameui = loader.load(settings_screen, key="settings")
+    reopen = lameui.get_component_by_name("reopen")
+    reopen.on_click.connect(on_press_reopen)
+    return lameui
+
+
+def on_press_reopen(button):
+    global lameui
+    if button == pygame.BUTTON_LEFT:
+        lameui = open_screen()
+
+
+lameui = open_screen()
+
+run = True
+while run:
+
+    for event in lameui.handle_events(pygame.event.get()):
+        if event.type == pygame.QUIT:
+            run = False
+
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                run = False
+
+    lameui.process_mouse_pos()
+    rects = lameui.draw_to(screen, dirty_rects=True)
+
+    pygame.display.update(rects)
+    clock.tick(FPS)
+
+pygame.quit()
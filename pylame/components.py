@@ -1,6 +1,17 @@
 from __future__ import annotations
+import copy
+import math
+import time
+from contextlib import contextmanager
 import pygame
 
+from . import profiling, surfaces
+from .fonts import get_font, render_text, text_cache
+from .scheduler import Scheduler, Timer, Tween, ease_in_out_quad
+from .signals import ChangeSignal, Signal, flush as flush_signals
+from .spatial import GridIndex
+from .textbuffer import GapBuffer, find_word_start, find_word_end
+
 
 class Alignment:
 
@@ -10,45 +21,238 @@ class Alignment:
 
 
 class Component:
+    # compare every cached absolute position against a walk up the parents
+    check_abs_pos = False
+
+    # __dict__ stays available for attributes set from outside, such as
+    # on_press callbacks, and is only allocated when one is set
+    __slots__ = ("size", "_pos", "_base_pos", "_parent", "abs_pos", "event_handlers", "bg_color",
+                 "_highlight_color", "name", "surface", "dirty", "needs_layout", "layout_dirty",
+                 "damaged", "batch_depth", "__dict__")
+
     def __init__(self, size, pos, bg_color=None, name="", parent=None):
         self.size = size
-        self.pos = pos
-        self.base_pos = pos
+        self._pos = pos
+        self._base_pos = pos
+        self._parent: Component | None = parent
+        # cached by get_abs_pos, None once pos or an ancestor moved
+        self.abs_pos: tuple | None = None
+        # event type -> handlers, created on the first subscribe
+        self.event_handlers: dict[int, list] | None = None
         self.bg_color = bg_color
         if self.bg_color is None:
             self.bg_color = (0, 0, 0, 0)
         elif len(self.bg_color) == 3:
             self.bg_color = self.bg_color + (255,)
         self.name = name
-        self.parent: Component | None = parent
-        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        # allocated by resize_surface on the first paint
+        self.surface: pygame.Surface | None = None
+        # above 0 inside Panel.batch, updates are skipped until it ends
+        self.batch_depth = 0
+
+        # dirty: needs repaint
+        # needs_layout: own measure/arrange is stale
+        # layout_dirty: this component or a descendant needs layout
+        # damaged: own pixels changed, not only those of a descendant
+        self.dirty = True
+        self.needs_layout = True
+        self.layout_dirty = True
+        self.damaged = True
+
+        self._highlight_color = None
+
+    @property
+    def highlight_color(self):
+        # worked out from bg_color the first time it is used
+        if self._highlight_color is None:
+            scale = 80
+
+            r, g, b, a = self.bg_color
+
+            r = min(r+scale, 255)
+            g = min(g+scale, 255)
+            b = min(b+scale, 255)
+            a = min(a+scale, 255)
+
+            self._highlight_color = (r, g, b, a)
+        return self._highlight_color
+
+    @highlight_color.setter
+    def highlight_color(self, color):
+        self._highlight_color = color
+
+    # set by the first use of on_change
+    _on_change = None
+
+    @property
+    def on_change(self) -> ChangeSignal:
+        # for components with a value, reported once per frame when it
+        # changed, see signals.bind
+        if self._on_change is None:
+            self._on_change = ChangeSignal(self)
+        return self._on_change
+
+    def get_value(self):
+        return None
 
-        self.highlight_color = None
-        scale = 80
+    def get_change_key(self):
+        # compared by on_change to skip changes that were undone, for
+        # components whose value is costly to build and compare
+        return self.get_value()
 
-        r, g, b, a = self.bg_color
+    def notify_change(self):
+        if self._on_change is not None:
+            self._on_change.notify()
 
-        r = min(r+scale, 255)
-        g = min(g+scale, 255)
-        b = min(b+scale, 255)
-        a = min(a+scale, 255)
+    @property
+    def pos(self):
+        return self._pos
 
-        self.highlight_color = (r, g, b, a)
+    @pos.setter
+    def pos(self, pos):
+        if pos == self._pos:
+            return
+        self._pos = pos
+        self.invalidate_abs_pos()
+
+    @property
+    def base_pos(self):
+        return self._base_pos
+
+    @base_pos.setter
+    def base_pos(self, base_pos):
+        if base_pos == self._base_pos:
+            return
+        self._base_pos = base_pos
+        if self._parent is not None:
+            self._parent.invalidate_layout()
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        if parent is self._parent:
+            return
+        self._parent = parent
+        self.invalidate_abs_pos()
+
+    def invalidate_abs_pos(self):
+        # a cached position implies cached ancestors, so an invalid
+        # component never has valid descendants
+        self.abs_pos = None
 
     def get_surface(self):
         return self.surface
 
+    def is_opaque(self):
+        # every pixel redraw writes is opaque, overridden by components
+        # drawing with other colors or rounded corners
+        return surfaces.is_opaque_color(self.bg_color)
+
+    def resize_surface(self):
+        # keep the surface while the size and format are unchanged, redraw
+        # repaints it
+        opaque = surfaces.convert_enabled and self.is_opaque()
+        if self.surface is not None and surfaces.matches(self.surface, self.size, opaque):
+            return
+        self.surface = surfaces.new_surface(self.size, opaque)
+        profiling.count("surface_alloc", self)
+
     def redraw(self):
         assert False, "unimplemented"
 
+    def invalidate(self):
+        # a dirty component always has dirty ancestors, so stop at the first one
+        self.damaged = True
+        comp = self
+        while comp is not None and not comp.dirty:
+            comp.dirty = True
+            comp = comp.parent
+
+    def invalidate_layout(self):
+        self.needs_layout = True
+        comp = self
+        while comp is not None and not comp.layout_dirty:
+            comp.layout_dirty = True
+            comp = comp.parent
+        self.invalidate()
+
+    def measure(self):
+        pass
+
+    def arrange(self):
+        self.needs_layout = False
+        self.layout_dirty = False
+
+    def paint(self, damage: list[pygame.Rect] | None = None, clip: pygame.Rect | None = None):
+        # clip is used by containers, a component is always drawn whole
+        if not self.dirty or self.batch_depth:
+            return
+        if damage is not None and self.damaged:
+            damage.append(self.get_abs_rect())
+        if profiling.active is not None:
+            profiling.active.count("redraw", self)
+        self.resize_surface()
+        self.redraw()
+        self.dirty = False
+        self.damaged = False
+
+    def is_batching(self):
+        comp = self
+        while comp is not None:
+            if comp.batch_depth:
+                return True
+            comp = comp.parent
+        return False
+
+    def update(self, damage: list[pygame.Rect] | None = None):
+        if self.is_batching():
+            return
+        if self.layout_dirty:
+            self.measure()
+            self.arrange()
+        self.paint(damage)
+
     def __str__(self) -> str:
         if self.name:
             return self.name
         return self.__repr__()
 
+    def subscribe(self, event_type, handler):
+        # handler(event) returns True to consume the event and stop bubbling
+        if self.event_handlers is None:
+            self.event_handlers = {}
+        self.event_handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        if self.event_handlers is None:
+            return
+        handlers = self.event_handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def call_handlers(self, event) -> bool:
+        if self.event_handlers is None:
+            return False
+        handlers = self.event_handlers.get(event.type)
+        if not handlers:
+            return False
+        for handler in handlers:
+            if handler(event):
+                return True
+        return False
+
     def on_hover(self):
         pass
 
+    def on_hover_enter(self):
+        pass
+
+    def on_hover_leave(self):
+        pass
+
     def handle_mouse_selected(self, *args, **kwargs):
         pass
 
@@ -60,6 +264,12 @@ class Component:
             return self.parent.get_root()
         return self
 
+    def get_scheduler(self) -> Scheduler | None:
+        root = self.get_root()
+        if isinstance(root, LameUI):
+            return root.scheduler
+        return None
+
     def on_press(self, *args, **kwargs):
         root = self.get_root()
         if isinstance(root, LameUI):
@@ -75,17 +285,242 @@ class Component:
         pass
 
     def get_abs_pos(self):
-        pos_x, pos_y = self.pos
+        abs_pos = self.abs_pos
+        if abs_pos is None:
+            pos_x, pos_y = self._pos
 
-        if self.parent is not None:
-            px, py = self.parent.get_abs_pos()
+            if self._parent is not None:
+                px, py = self._parent.get_abs_pos()
+                pos_x += px
+                pos_y += py
+            abs_pos = self.abs_pos = (pos_x, pos_y)
+
+        if Component.check_abs_pos:
+            walked = self.walk_abs_pos()
+            assert abs_pos == walked, f"{self}: cached {abs_pos}, walked {walked}"
+
+        return abs_pos
+
+    def walk_abs_pos(self):
+        pos_x, pos_y = self._pos
+
+        if self._parent is not None:
+            px, py = self._parent.walk_abs_pos()
             pos_x += px
             pos_y += py
         return pos_x, pos_y
 
+    def get_abs_rect(self):
+        return pygame.Rect(self.get_abs_pos(), self.size)
+
+    def clone(self):
+        # detached copy of this subtree with its own surfaces, handlers
+        # subscribed as bound methods are bound to the copies
+        memo = {}
+        if self.parent is not None:
+            memo[id(self.parent)] = None
+        return copy.deepcopy(self, memo)
+
+    def __deepcopy__(self, memo):
+        clone = object.__new__(type(self))
+        memo[id(self)] = clone
+        for key in get_slot_names(type(self)):
+            value = getattr(self, key, memo)
+            if value is memo:
+                # slot never set
+                continue
+            if type(value) in IMMUTABLE_TYPES:
+                pass
+            elif key == "event_handlers":
+                value = {event_type: [clone_handler(handler, self, clone) for handler in handlers]
+                         for event_type, handlers in value.items()}
+            else:
+                value = clone_value(value, memo)
+            setattr(clone, key, value)
+
+        state = self.__dict__
+        if state:
+            clone.__dict__.update({key: clone_value(value, memo) for key, value in state.items()})
+        return clone
+
+
+IMMUTABLE_TYPES = {int, float, bool, str, tuple, type(None)}
+
+SLOT_NAMES: dict[type, list[str]] = {}
+
+
+def get_slot_names(cls):
+    # every slot of cls and its bases
+    names = SLOT_NAMES.get(cls)
+    if names is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in ("__dict__", "__weakref__"):
+                    names.append(name)
+        SLOT_NAMES[cls] = names
+    return names
+
+
+def clone_value(value, memo):
+    # deepcopy with shortcuts for what components hold the most of
+    value_type = type(value)
+    if value_type in IMMUTABLE_TYPES:
+        return value
+    if value_type is list:
+        return [v if type(v) in IMMUTABLE_TYPES else clone_value(v, memo) for v in value]
+    copied = memo.get(id(value), memo)
+    if copied is not memo:
+        return copied
+    if isinstance(value, pygame.Surface):
+        return value.copy()
+    return copy.deepcopy(value, memo)
+
+
+def clone_handler(handler, old, new):
+    if getattr(handler, "__self__", None) is old:
+        return getattr(new, handler.__name__)
+    return handler
+
+
+def coalesce_mouse_motion(events: list[pygame.event.Event]) -> list[pygame.event.Event]:
+    # runs of MOUSEMOTION collapse into one event at the last position,
+    # rel is summed so the total movement is kept
+    result: list[pygame.event.Event] = []
+    for event in events:
+        if event.type == pygame.MOUSEMOTION and result and result[-1].type == pygame.MOUSEMOTION:
+            prev_x, prev_y = result[-1].rel
+            rel_x, rel_y = event.rel
+            result[-1] = pygame.event.Event(
+                pygame.MOUSEMOTION, event.dict, rel=(prev_x+rel_x, prev_y+rel_y))
+        else:
+            result.append(event)
+    return result
+
+
+def merge_rects(rects: list[pygame.Rect], max_rects=16) -> list[pygame.Rect]:
+    merged: list[pygame.Rect] = []
+    for rect in rects:
+        if not rect.width or not rect.height:
+            continue
+        rect = rect.copy()
+        # absorbing a rect can make the union overlap earlier ones, so rescan
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+
+    if len(merged) > max_rects:
+        return [merged[0].unionall(merged[1:])]
+    return merged
+
+
+def is_inside(component, ancestor):
+    while component is not None:
+        if component is ancestor:
+            return True
+        component = component.parent
+    return False
+
+
+def overrides_process(component):
+    # Panel.process only passes dt on to the children
+    return type(component).process not in (Component.process, Panel.process)
+
+
+def render_counted(component, *args) -> pygame.Surface:
+    # render_text, reported to the profiler as a text_render when the
+    # shared cache had to render it and as a text_cache_hit otherwise
+    misses = text_cache.misses
+    render = render_text(*args)
+    if profiling.active is not None:
+        kind = "text_render" if text_cache.misses != misses else "text_cache_hit"
+        profiling.active.count(kind, component)
+    return render
+
+
+class Container(Component):
+    __slots__ = ("components", "sizer", "clip")
+
+    def __init__(self, size, pos, bg_color=None, name="", parent=None):
+        super().__init__(size=size, pos=pos, bg_color=bg_color, name=name, parent=parent)
+        self.components: list[Component] = []
+        self.sizer = Sizer(self)
+        # part of the surface drawn by the last paint, in own coordinates
+        self.clip: pygame.Rect | None = None
+
+    def invalidate_abs_pos(self):
+        if self.abs_pos is None:
+            return
+        self.abs_pos = None
+        for comp in self.components:
+            comp.invalidate_abs_pos()
+
+    def measure(self):
+        for comp in self.components:
+            if comp.layout_dirty and not comp.batch_depth:
+                size = comp.size
+                comp.measure()
+                if comp.size != size:
+                    self.needs_layout = True
+
+    def arrange(self):
+        if self.needs_layout:
+            self.sizer.calc_pos()
+            self.needs_layout = False
+            # a culled child that changed size does not flag its parent
+            self.invalidate()
+        for comp in self.components:
+            if comp.layout_dirty and not comp.batch_depth:
+                comp.arrange()
+        self.layout_dirty = False
+
+    def get_clip(self, clip: pygame.Rect | None) -> pygame.Rect:
+        # clip: part visible through the ancestors, None for all of it
+        if clip is None:
+            clip = pygame.Rect((0, 0), self.size)
+        if self.clip is None or not self.clip.contains(clip):
+            # pixels outside the last clip were never drawn
+            self.dirty = True
+        return clip
+
+    def paint(self, damage: list[pygame.Rect] | None = None, clip: pygame.Rect | None = None):
+        clip = self.get_clip(clip)
+        if not self.dirty or self.batch_depth:
+            return
+        if damage is not None and self.damaged:
+            damage.append(self.get_abs_rect())
+            # own rect covers everything the children could report
+            damage = None
+        for comp in self.components:
+            rect = pygame.Rect(comp.pos, comp.size)
+            # positions can be fractional, pad a pixel for rounding
+            visible = clip.clip(rect.inflate(2, 2))
+            if not visible:
+                # painted once it is visible again, the clip of an ancestor
+                # only grows through a layout change that repaints it
+                if profiling.active is not None:
+                    profiling.active.count("culled", comp)
+                continue
+            comp.paint(damage, visible.move(-rect.x, -rect.y))
+        if profiling.active is not None:
+            profiling.active.count("redraw", self)
+        self.resize_surface()
+        self.surface.set_clip(clip)
+        self.redraw()
+        self.clip = clip
+        self.dirty = False
+        self.damaged = False
+
 
 class Text(Component):
-    def __init__(self, text, font_size=None, font_color=None, pos=None):
+    __slots__ = ("font_size", "font_color", "font_face", "bold", "italic", "antialias", "text", "render")
+
+    def __init__(self, text, font_size=None, font_color=None, pos=None, font_face=None, bold=False, italic=False, antialias=True):
         size = (0, 0)
         if pos is None:
             pos = (0, 0)
@@ -98,6 +533,11 @@ class Text(Component):
         if font_color:
             self.font_color = font_color
 
+        self.font_face = font_face
+        self.bold = bold
+        self.italic = italic
+        self.antialias = antialias
+
         self.text = text
 
         self.__render_text()
@@ -107,170 +547,972 @@ class Text(Component):
         # rect.center = (width/2, height/2)
 
     def __render_text(self):
-        font = pygame.font.Font(pygame.font.get_default_font(), self.font_size)
-        self.render = font.render(self.text, True, self.font_color)
+        self.render = render_counted(self, self.text, self.font_face, self.font_size,
+                                     self.font_color, self.bold, self.italic, self.antialias)
+        # set here as well, a culled text is blitted without being painted
+        self.surface = self.render
         self.size = self.render.get_size()
 
     def set_text(self, text):
-        self.text = str(text)
-        self.__render_text()
+        text = str(text)
+        if text == self.text:
+            return
+        self.text = text
+        self.render = None
+        self.invalidate_layout()
 
     def set_font_color(self, color):
+        if color == self.font_color:
+            return
         self.font_color = color
-        self.__render_text()
+        self.render = None
+        self.invalidate()
+
+    def set_font(self, font_face=None, font_size=None, bold=None, italic=None):
+        if font_face is not None:
+            self.font_face = font_face
+        if font_size is not None:
+            self.font_size = font_size
+        if bold is not None:
+            self.bold = bold
+        if italic is not None:
+            self.italic = italic
+        self.render = None
+        self.invalidate_layout()
+
+    def measure(self):
+        if self.render is None:
+            self.__render_text()
+
+    def __deepcopy__(self, memo):
+        # renders come from the shared text cache and are never drawn on
+        if self.render is not None:
+            memo[id(self.render)] = self.render
+        return super().__deepcopy__(memo)
+
+    def resize_surface(self):
+        # never has a surface of its own
+        pass
 
     def redraw(self):
-        self.surface = pygame.Surface(self.size, pygame.SRCALPHA)
-        self.surface.blit(self.render, (0, 0))
+        if self.render is None:
+            self.__render_text()
+        # the render comes from the shared text cache, it is blitted by the
+        # parent as is and never drawn on
+        self.surface = self.render
+
+
+class TextEditing:
+    # caret blink, key repeat, clipboard and selection shared by TextInput
+    # and TextArea, which add SLOTS to their own __slots__
+    __slots__ = ()
+    SLOTS = ("anchor", "selection_color", "editing", "display_bar", "dragging", "blink_interval",
+             "repeat_delay", "repeat_interval", "blink_timer", "repeat_timer", "repeat_key")
+
+    def init_editing(self):
+        # other end of the selection, None when nothing is selected
+        self.anchor = None
+        self.selection_color = (60, 100, 170)
+        self.editing = False
+        self.display_bar = True
+        self.dragging = False
+
+        # ms, driven by the root's scheduler while selected
+        self.blink_interval = 2000
+        self.repeat_delay = 450
+        self.repeat_interval = 75
+        self.blink_timer: Timer | None = None
+        self.repeat_timer: Timer | None = None
+        self.repeat_key = None
+
+    def get_selection(self):
+        # caret and anchor ordered, None when nothing is selected
+        if self.anchor is None or self.anchor == self.caret:
+            return None
+        return min(self.anchor, self.caret), max(self.anchor, self.caret)
+
+    def get_press_pos(self):
+        # where the press happened, the pointer may have moved on since
+        root = self.get_root()
+        if isinstance(root, LameUI) and root.press_pos is not None:
+            return root.press_pos
+        return pygame.mouse.get_pos()
+
+    def toggle_bar(self):
+        self.display_bar = not self.display_bar
+        self.invalidate()
+
+    def start_repeat(self, key, action):
+        # runs action now and again while key is held, like backspace
+        action()
+        self.stop_repeat()
+        self.repeat_key = key
+        scheduler = self.get_scheduler()
+        if scheduler is not None:
+            self.repeat_timer = scheduler.call_every(
+                self.repeat_interval, action, delay=self.repeat_delay)
+
+    def stop_repeat(self):
+        self.repeat_key = None
+        if self.repeat_timer is not None:
+            self.repeat_timer.cancel()
+            self.repeat_timer = None
+
+    @staticmethod
+    def init_clipboard():
+        # scrap needs a display, without one copy and paste do nothing
+        if not pygame.scrap.get_init():
+            try:
+                pygame.scrap.init()
+            except pygame.error:
+                return False
+        return pygame.scrap.get_init()
+
+    def copy(self):
+        text = self.get_selected_text()
+        if text and self.init_clipboard():
+            try:
+                pygame.scrap.put(pygame.SCRAP_TEXT, text.encode())
+            except pygame.error:
+                pass
+
+    def clean_paste(self, text):
+        return text
+
+    def paste(self):
+        if not self.init_clipboard():
+            return
+        data = pygame.scrap.get(pygame.SCRAP_TEXT)
+        if data:
+            self.insert(self.clean_paste(data.decode(errors="ignore").rstrip("\0")))
+
+    def on_select(self):
+        self.editing = True
+        self.display_bar = True
+        self.invalidate()
+        scheduler = self.get_scheduler()
+        if scheduler is not None and self.blink_timer is None:
+            self.blink_timer = scheduler.call_every(
+                self.blink_interval, self.toggle_bar)
+
+    def on_unselect(self):
+        self.editing = False
+        self.dragging = False
+        self.stop_repeat()
+        if self.blink_timer is not None:
+            self.blink_timer.cancel()
+            self.blink_timer = None
+        self.invalidate()
+
+    def on_release(self, *args, **kwargs):
+        self.dragging = False
+
 
+class TextInput(TextEditing, Container):
+    __slots__ = ("buffer", "caret", "view_start", "view_advances", "text_s", "cursor_x", "_on_change",
+                 "edits") + TextEditing.SLOTS
 
-class TextInput(Component):
-    def __init__(self, size, pos, name="", bg_color=None, parent=None, text="", font_color=None):
+    def __init__(self, size, pos, name="", bg_color=None, parent=None, text="", font_color=None, font_face=None):
         super().__init__(size=size, pos=pos,  bg_color=bg_color, name=name, parent=parent)
+        self._on_change: ChangeSignal | None = None
+        # counts changes to the text, see get_change_key
+        self.edits = 0
 
-        self.components = []
-        self.sizer = Sizer(self)
         self.sizer.set_alignment(Alignment.CENTER_VERTICAL)
 
-        self.text = text
-        self.text_s = Text(text, size[1]-2, font_color)
-        self.editing = False
-        self.display_bar = True
-        self.counter = 1300
-
-        self.__initial_delete_interval = 450
+        self.buffer = GapBuffer(text)
+        self.caret = len(self.buffer)
+        self.init_editing()
 
-        self.delete_interval = 0
-        self.reset_delete_interval()
-        self.deleting = False
+        # only the visible slice of the buffer is handed to text_s
+        self.view_start = 0
+        self.view_advances: list[int] = []
+        self.text_s = Text("", size[1]-2, font_color, font_face=font_face)
+        self.cursor_x = 0
 
+        self.text_s.parent = self
         self.components.append(self.text_s)
 
-    def redraw(self):
-        self.text_s.set_text(self.text)
-        width, height = self.size
-        text_w, text_h = self.text_s.size
+        self.subscribe(pygame.TEXTINPUT, self.handle_event)
+        self.subscribe(pygame.KEYDOWN, self.handle_event)
+        self.subscribe(pygame.KEYUP, self.handle_event)
 
-        pad = self.text_s.font_size/2
+    @property
+    def text(self):
+        # joins the whole buffer, keep it out of per keystroke paths
+        return self.buffer.get_text()
 
-        cursor_w = self.text_s.font_size/7
-        cursor_h = self.text_s.font_size
+    @text.setter
+    def text(self, text):
+        self.set_text(text)
 
-        cursor_x = text_w
-        cursor_y = 2/2
-        d = text_w+pad
+    def get_value(self):
+        return self.text
+
+    def get_change_key(self):
+        # the text is only joined when a change is emitted
+        return self.edits
+
+    def notify_change(self):
+        self.edits += 1
+        super().notify_change()
+
+    def set_text(self, text):
+        self.buffer.set_text(str(text))
+        self.caret = len(self.buffer)
+        self.anchor = None
+        self.view_start = 0
+        self.invalidate_layout()
+        self.notify_change()
+
+    def get_selected_text(self):
+        selection = self.get_selection()
+        if selection is None:
+            return ""
+        return self.buffer.get_text(*selection)
+
+    def set_caret(self, pos, extend=False):
+        pos = max(0, min(pos, len(self.buffer)))
+        if extend:
+            if self.anchor is None:
+                self.anchor = self.caret
+        else:
+            self.anchor = None
+        self.caret = pos
+        self.display_bar = True
+        self.invalidate_layout()
+
+    def select_all(self):
+        self.anchor = 0
+        self.caret = len(self.buffer)
+        self.invalidate_layout()
+
+    def delete_selection(self):
+        selection = self.get_selection()
+        self.anchor = None
+        if selection is None:
+            return False
+        start, end = selection
+        self.buffer.delete(start, end)
+        self.caret = start
+        self.invalidate_layout()
+        self.notify_change()
+        return True
+
+    def insert(self, text):
+        self.delete_selection()
+        self.buffer.insert(self.caret, text)
+        self.caret += len(text)
+        self.display_bar = True
+        self.invalidate_layout()
+        self.notify_change()
 
-        self.text_s.base_pos = (0, 0)
-        if d > width:
-            diff = d - width
-            self.text_s.base_pos = (-diff, 0)
-            cursor_x = text_w - diff
+    def delete_before(self, word=False):
+        if self.delete_selection() or self.caret == 0:
+            return
+        start = self.caret - 1
+        if word:
+            start = self.buffer.find_word_start(self.caret)
+        self.buffer.delete(start, self.caret)
+        self.caret = start
+        self.display_bar = True
+        self.invalidate_layout()
+        self.notify_change()
 
-        char_cursor_padding = 6
+    def delete_after(self, word=False):
+        if self.delete_selection() or self.caret == len(self.buffer):
+            return
+        end = self.caret + 1
+        if word:
+            end = self.buffer.find_word_end(self.caret)
+        self.buffer.delete(self.caret, end)
+        self.display_bar = True
+        self.invalidate_layout()
+        self.notify_change()
+
+    def move_left(self, word=False, extend=False):
+        selection = self.get_selection()
+        if selection is not None and not extend:
+            self.set_caret(selection[0])
+        elif word:
+            self.set_caret(self.buffer.find_word_start(self.caret), extend)
+        else:
+            self.set_caret(self.caret - 1, extend)
+
+    def move_right(self, word=False, extend=False):
+        selection = self.get_selection()
+        if selection is not None and not extend:
+            self.set_caret(selection[1])
+        elif word:
+            self.set_caret(self.buffer.find_word_end(self.caret), extend)
+        else:
+            self.set_caret(self.caret + 1, extend)
+
+    def get_font(self) -> pygame.font.Font:
+        text_s = self.text_s
+        return get_font(text_s.font_face, text_s.font_size, text_s.bold, text_s.italic)
+
+    @staticmethod
+    def get_advances(font: pygame.font.Font, text):
+        advances = []
+        for char, metrics in zip(text, font.metrics(text)):
+            if metrics is None:
+                advances.append(font.size(char)[0])
+            else:
+                advances.append(metrics[4])
+        return advances
+
+    def update_view(self):
+        # scrolls so the caret stays visible, then renders the characters
+        # that fit. every step looks at no more characters than fit in the
+        # width (at least a pixel each), whatever the length of the text
+        font = self.get_font()
+        buffer = self.buffer
+        length = len(buffer)
+        caret = self.caret
+        width = max(int(self.size[0] - self.get_cursor_width()), 1)
+        max_chars = width + 1
+
+        if caret < self.view_start:
+            self.view_start = caret
+
+        start = max(self.view_start, caret - max_chars)
+        advances = self.get_advances(font, buffer.get_text(start, caret))
+        if start > self.view_start or sum(advances) > width:
+            x = 0
+            i = len(advances)
+            while i > 0 and x + advances[i-1] <= width:
+                x += advances[i-1]
+                i -= 1
+            self.view_start = start + i
+
+        end = min(length, self.view_start + max_chars)
+        advances = self.get_advances(font, buffer.get_text(self.view_start, end))
+        x = 0
+        count = 0
+        for advance in advances:
+            if x >= width:
+                break
+            x += advance
+            count += 1
+
+        if self.view_start + count == length and x < width and self.view_start > 0:
+            # deleting at the end leaves room, pull earlier text back in
+            start = max(0, self.view_start - max_chars)
+            before = self.get_advances(font, buffer.get_text(start, self.view_start))
+            while before and x + before[-1] <= width:
+                x += before[-1]
+                advances.insert(0, before.pop())
+                self.view_start -= 1
+                count += 1
+
+        self.view_advances = advances[:count]
+        self.text_s.set_text(buffer.get_text(self.view_start, self.view_start + count))
+        self.cursor_x = self.get_view_x(caret)
+
+    def get_view_x(self, pos):
+        # x of a buffer position relative to the start of the visible text
+        i = max(0, min(pos - self.view_start, len(self.view_advances)))
+        return sum(self.view_advances[:i])
+
+    def get_pos_at(self, x):
+        # buffer position closest to a local x coordinate
+        x -= self.text_s.pos[0]
+        pos = self.view_start
+        for advance in self.view_advances:
+            if x < advance/2:
+                break
+            x -= advance
+            pos += 1
+        return pos
+
+    def get_cursor_width(self):
+        return self.text_s.font_size/7
+
+    def measure(self):
+        if self.needs_layout:
+            self.update_view()
+        super().measure()
+
+    def is_opaque(self):
+        return (surfaces.is_opaque_color(self.bg_color)
+                and surfaces.is_opaque_color(self.selection_color)
+                and surfaces.is_opaque_color(self.text_s.font_color))
 
-        cursor_x += char_cursor_padding
+    def redraw(self):
+        cursor_w = self.get_cursor_width()
+        cursor_h = self.text_s.font_size
+        cursor_y = 2/2
+
+        self.surface.fill(self.bg_color)
 
-        self.sizer.calc_pos()
-        rect = self.surface.get_rect()
-        pygame.draw.rect(self.surface, self.bg_color, rect)
+        text_x, text_y = self.text_s.pos
+        selection = self.get_selection()
+        if selection is not None:
+            x0 = self.get_view_x(selection[0])
+            x1 = self.get_view_x(selection[1])
+            if x1 > x0:
+                rect = pygame.Rect(text_x + x0, cursor_y, x1 - x0, cursor_h)
+                pygame.draw.rect(self.surface, self.selection_color, rect)
 
         if self.editing and self.display_bar:
-            rect = pygame.Rect(
-                cursor_x, cursor_y, cursor_w, cursor_h)
+            cursor_x = min(text_x + self.cursor_x, self.size[0] - cursor_w)
+            rect = pygame.Rect(cursor_x, cursor_y, cursor_w, cursor_h)
             pygame.draw.rect(self.surface, self.text_s.font_color, rect)
 
         self.surface.blit(self.text_s.get_surface(), self.text_s.pos)
 
-    def process(self, dt):
-        if not self.editing:
+    def clean_paste(self, text):
+        # a single line
+        return text.replace("\r", "").replace("\n", " ")
+
+    def get_local_mouse_x(self, mouse_x):
+        return mouse_x - self.get_abs_pos()[0]
+
+    def on_press(self, button):
+        if button == pygame.BUTTON_LEFT:
+            root = self.get_root()
+            if isinstance(root, LameUI):
+                root.set_selected(self)
+            mouse_x, _ = self.get_press_pos()
+            self.set_caret(self.get_pos_at(self.get_local_mouse_x(mouse_x)))
+            self.dragging = True
+
+    def handle_mouse_selected(self, *args):
+        if not self.dragging:
             return
-        self.counter -= dt
-        if self.counter < 0:
-            self.counter = 2000
-            self.display_bar = not self.display_bar
+        mouse_x, mouse_y = args
+        pos = self.get_pos_at(self.get_local_mouse_x(mouse_x))
+        if pos != self.caret:
+            self.set_caret(pos, extend=True)
+
+    def handle_event(self, event):
+        if event.type == pygame.TEXTINPUT:
+            self.insert(event.text)
+            return True
 
-        if self.deleting:
-            self.delete_interval -= dt
-            if self.delete_interval < 0:
-                self.reset_delete_interval()
-                self.__delete_char()
+        elif event.type == pygame.KEYDOWN:
+            key = event.key
+            ctrl = bool(event.mod & pygame.KMOD_CTRL)
+            shift = bool(event.mod & pygame.KMOD_SHIFT)
+
+            if key == pygame.K_BACKSPACE:
+                self.start_repeat(key, lambda: self.delete_before(ctrl))
+            elif key == pygame.K_DELETE:
+                self.start_repeat(key, lambda: self.delete_after(ctrl))
+            elif key == pygame.K_LEFT:
+                self.start_repeat(key, lambda: self.move_left(ctrl, shift))
+            elif key == pygame.K_RIGHT:
+                self.start_repeat(key, lambda: self.move_right(ctrl, shift))
+            elif key == pygame.K_HOME:
+                self.set_caret(0, shift)
+            elif key == pygame.K_END:
+                self.set_caret(len(self.buffer), shift)
+            elif ctrl and key == pygame.K_a:
+                self.select_all()
+            elif ctrl and key == pygame.K_c:
+                self.copy()
+            elif ctrl and key == pygame.K_x:
+                self.copy()
+                self.delete_selection()
+            elif ctrl and key == pygame.K_v:
+                self.paste()
+            else:
+                return False
+            return True
 
-    def reset_delete_interval(self):
-        self.delete_interval = 75
+        elif event.type == pygame.KEYUP:
+            if event.key == self.repeat_key:
+                self.stop_repeat()
+                return True
 
-    def __delete_char(self):
-        self.text = self.text[:-1]
+        return False
 
-    def on_select(self):
-        self.editing = True
+
+class TextLine:
+    __slots__ = ("text", "render")
+
+    def __init__(self, text):
+        self.text = text
+        # cached render, None until painted or after the line changed
+        self.render: pygame.Surface | None = None
+
+    def __deepcopy__(self, memo):
+        line = TextLine(self.text)
+        line.render = self.render
+        return line
+
+
+class TextArea(TextEditing, Component):
+    # multiline editor, lines keep their own render which is only redone
+    # when that line changes, and only lines in view are rendered and painted
+    __slots__ = ("font_size", "font_color", "font_face", "read_only", "padding", "lines", "rendered",
+                 "line_height", "scroll_x", "scroll_y", "scroll_speed", "follow", "caret",
+                 "scrollbar_width", "scrollbar_color") + TextEditing.SLOTS
+
+    def __init__(self, size, pos, name="", bg_color=None, parent=None, text="", font_size=16, font_color=None, font_face=None, read_only=False, scroll_speed=None):
+        super().__init__(size=size, pos=pos, bg_color=bg_color, name=name, parent=parent)
+        self.font_size = font_size
+        self.font_color = (240, 240, 240)
+        if font_color:
+            self.font_color = font_color
+        self.font_face = font_face
+        self.read_only = read_only
+        self.padding = 4
+
+        self.lines: list[TextLine] = []
+        self.rendered: list[TextLine] = []
+        self.line_height = get_font(font_face, font_size).get_linesize()
+        self.scroll_x = 0
+        self.scroll_y = 0
+        self.scroll_speed = scroll_speed
+        if self.scroll_speed is None:
+            self.scroll_speed = self.line_height*3
+        # keep the last line in view while appending, like a log
+        self.follow = False
+
+        # caret and selection anchor as (line, column)
+        self.caret = (0, 0)
+        self.init_editing()
+
+        self.scrollbar_width = 6
+        self.scrollbar_color = self.highlight_color
+
+        self.set_text(text)
+
+        self.subscribe(pygame.TEXTINPUT, self.handle_event)
+        self.subscribe(pygame.KEYDOWN, self.handle_event)
+        self.subscribe(pygame.KEYUP, self.handle_event)
+        self.subscribe(pygame.MOUSEWHEEL, self.handle_wheel_event)
+
+    @property
+    def text(self):
+        return "\n".join(line.text for line in self.lines)
+
+    @text.setter
+    def text(self, text):
+        self.set_text(text)
+
+    def set_text(self, text):
+        self.lines = [TextLine(line) for line in str(text).split("\n")]
+        self.caret = (0, 0)
+        self.anchor = None
+        self.scroll_x = 0
+        self.scroll_y = 0
+        self.invalidate()
+
+    def append(self, text):
+        # adds lines at the end without touching the caret
+        at_bottom = self.scroll_y >= self.get_max_scroll_y()
+        new_lines = str(text).split("\n")
+        last = self.lines[-1]
+        if last.text:
+            self.lines.append(TextLine(new_lines[0]))
+        else:
+            last.text = new_lines[0]
+            last.render = None
+        self.lines.extend(TextLine(line) for line in new_lines[1:])
+        if self.follow and at_bottom:
+            self.scroll_y = self.get_max_scroll_y()
+        self.invalidate()
+
+    def get_font(self) -> pygame.font.Font:
+        return get_font(self.font_face, self.font_size)
+
+    def get_line_render(self, line: TextLine) -> pygame.Surface:
+        if line.render is None:
+            line.render = render_counted(self, line.text, self.font_face,
+                                         self.font_size, self.font_color)
+        return line.render
+
+    def set_line_text(self, index, text):
+        line = self.lines[index]
+        line.text = text
+        line.render = None
+
+    def get_col_x(self, index, col):
+        return self.get_font().size(self.lines[index].text[:col])[0]
+
+    def get_col_at(self, index, x):
+        text = self.lines[index].text
+        col = 0
+        for advance in TextInput.get_advances(self.get_font(), text):
+            if x < advance/2:
+                break
+            x -= advance
+            col += 1
+        return col
+
+    def get_pos_at(self, x, y):
+        # (line, column) under a local position
+        index = int((y - self.padding + self.scroll_y) // self.line_height)
+        index = max(0, min(index, len(self.lines) - 1))
+        return index, self.get_col_at(index, x - self.padding + self.scroll_x)
+
+    def get_max_scroll_y(self):
+        return max(0, len(self.lines)*self.line_height + 2*self.padding - self.size[1])
+
+    def scroll_to(self, scroll_y):
+        scroll_y = max(0, min(scroll_y, self.get_max_scroll_y()))
+        if scroll_y == self.scroll_y:
+            return
+        self.scroll_y = scroll_y
+        self.invalidate()
+
+    def scroll_to_caret(self):
+        index, col = self.caret
+        width, height = self.size
+        top = index*self.line_height
+        if top < self.scroll_y:
+            self.scroll_y = top
+        elif top + self.line_height > self.scroll_y + height - 2*self.padding:
+            self.scroll_y = top + self.line_height - height + 2*self.padding
+
+        x = self.get_col_x(index, col)
+        view_w = width - 2*self.padding - self.scrollbar_width
+        if x < self.scroll_x:
+            self.scroll_x = max(0, x - view_w//4)
+        elif x > self.scroll_x + view_w:
+            self.scroll_x = x - view_w + view_w//4
+
+    def get_selected_text(self):
+        selection = self.get_selection()
+        if selection is None:
+            return ""
+        (l0, c0), (l1, c1) = selection
+        if l0 == l1:
+            return self.lines[l0].text[c0:c1]
+        parts = [self.lines[l0].text[c0:]]
+        parts.extend(line.text for line in self.lines[l0+1:l1])
+        parts.append(self.lines[l1].text[:c1])
+        return "\n".join(parts)
+
+    def set_caret(self, index, col, extend=False):
+        index = max(0, min(index, len(self.lines) - 1))
+        col = max(0, min(col, len(self.lines[index].text)))
+        if extend:
+            if self.anchor is None:
+                self.anchor = self.caret
+        else:
+            self.anchor = None
+        self.caret = (index, col)
         self.display_bar = True
+        self.scroll_to_caret()
+        self.invalidate()
+
+    def select_all(self):
+        self.anchor = (0, 0)
+        self.caret = (len(self.lines) - 1, len(self.lines[-1].text))
+        self.invalidate()
+
+    def delete_selection(self):
+        selection = self.get_selection()
+        self.anchor = None
+        if selection is None:
+            return False
+        (l0, c0), (l1, c1) = selection
+        self.set_line_text(l0, self.lines[l0].text[:c0] + self.lines[l1].text[c1:])
+        del self.lines[l0+1:l1+1]
+        self.set_caret(l0, c0)
+        return True
+
+    def insert(self, text):
+        if self.read_only:
+            return
+        self.delete_selection()
+        index, col = self.caret
+        line = self.lines[index].text
+        new_lines = text.replace("\r", "").split("\n")
+        if len(new_lines) == 1:
+            text = new_lines[0]
+            self.set_line_text(index, line[:col] + text + line[col:])
+            self.set_caret(index, col + len(text))
+            return
 
-    def on_unselect(self):
-        self.editing = False
-        self.deleting = False
+        tail = line[col:]
+        self.set_line_text(index, line[:col] + new_lines[0])
+        self.lines[index+1:index+1] = [TextLine(t) for t in new_lines[1:]]
+        last = index + len(new_lines) - 1
+        self.set_line_text(last, new_lines[-1] + tail)
+        self.set_caret(last, len(new_lines[-1]))
+
+    def delete_before(self, word=False):
+        if self.read_only or self.delete_selection():
+            return
+        index, col = self.caret
+        if col == 0:
+            if index == 0:
+                return
+            prev = self.lines[index-1].text
+            self.set_line_text(index-1, prev + self.lines[index].text)
+            del self.lines[index]
+            self.set_caret(index-1, len(prev))
+            return
+        line = self.lines[index].text
+        start = find_word_start(line, col) if word else col - 1
+        self.set_line_text(index, line[:start] + line[col:])
+        self.set_caret(index, start)
+
+    def delete_after(self, word=False):
+        if self.read_only or self.delete_selection():
+            return
+        index, col = self.caret
+        line = self.lines[index].text
+        if col == len(line):
+            if index == len(self.lines) - 1:
+                return
+            self.set_line_text(index, line + self.lines[index+1].text)
+            del self.lines[index+1]
+        else:
+            end = find_word_end(line, col) if word else col + 1
+            self.set_line_text(index, line[:col] + line[end:])
+        self.set_caret(index, col)
+
+    def move_left(self, word=False, extend=False):
+        index, col = self.caret
+        selection = self.get_selection()
+        if selection is not None and not extend:
+            self.set_caret(*selection[0])
+        elif col == 0 and index > 0:
+            self.set_caret(index-1, len(self.lines[index-1].text), extend)
+        elif word:
+            self.set_caret(index, find_word_start(self.lines[index].text, col), extend)
+        else:
+            self.set_caret(index, col - 1, extend)
+
+    def move_right(self, word=False, extend=False):
+        index, col = self.caret
+        selection = self.get_selection()
+        if selection is not None and not extend:
+            self.set_caret(*selection[1])
+        elif col == len(self.lines[index].text) and index < len(self.lines) - 1:
+            self.set_caret(index+1, 0, extend)
+        elif word:
+            self.set_caret(index, find_word_end(self.lines[index].text, col), extend)
+        else:
+            self.set_caret(index, col + 1, extend)
+
+    def move_lines(self, n, extend=False):
+        # keeps the caret's x rather than its column across lines
+        index, col = self.caret
+        x = self.get_col_x(index, col)
+        index = max(0, min(index + n, len(self.lines) - 1))
+        self.set_caret(index, self.get_col_at(index, x), extend)
+
+    def get_page_lines(self):
+        return max(1, (self.size[1] - 2*self.padding)//self.line_height)
+
+    def is_opaque(self):
+        return (surfaces.is_opaque_color(self.bg_color)
+                and surfaces.is_opaque_color(self.selection_color)
+                and surfaces.is_opaque_color(self.font_color)
+                and surfaces.is_opaque_color(self.scrollbar_color))
+
+    def redraw(self):
+        width, height = self.size
+        self.surface.fill(self.bg_color)
+        self.scroll_y = min(self.scroll_y, self.get_max_scroll_y())
+
+        first = int(self.scroll_y // self.line_height)
+        last = min(len(self.lines),
+                   math.ceil((self.scroll_y + height) / self.line_height))
+        visible = self.lines[first:last]
+
+        x = self.padding - self.scroll_x
+        y = self.padding + first*self.line_height - self.scroll_y
+
+        selection = self.get_selection()
+        for index, line in enumerate(visible, first):
+            if selection is not None:
+                self.draw_selection(index, x, y, selection)
+            self.surface.blit(self.get_line_render(line), (x, y))
+            y += self.line_height
+
+        # drop renders that scrolled out so memory follows the viewport
+        visible_ids = set(map(id, visible))
+        for line in self.rendered:
+            if id(line) not in visible_ids:
+                line.render = None
+        self.rendered = visible
+
+        index, col = self.caret
+        if self.editing and self.display_bar and first <= index < last:
+            cursor_w = max(self.font_size/10, 1)
+            rect = pygame.Rect(x + self.get_col_x(index, col),
+                               self.padding + index*self.line_height - self.scroll_y,
+                               cursor_w, self.line_height)
+            pygame.draw.rect(self.surface, self.font_color, rect)
+
+        content_height = len(self.lines)*self.line_height + 2*self.padding
+        if content_height > height:
+            thumb_h = max(height*height/content_height, self.scrollbar_width)
+            thumb_y = (height - thumb_h)*self.scroll_y/self.get_max_scroll_y()
+            rect = pygame.Rect(width - self.scrollbar_width, thumb_y,
+                               self.scrollbar_width, thumb_h)
+            pygame.draw.rect(self.surface, self.scrollbar_color, rect,
+                             border_radius=self.scrollbar_width//2)
+
+    def draw_selection(self, index, x, y, selection):
+        (l0, c0), (l1, c1) = selection
+        if not l0 <= index <= l1:
+            return
+        line = self.lines[index].text
+        start = c0 if index == l0 else 0
+        end = c1 if index == l1 else len(line)
+        x0 = self.get_col_x(index, start)
+        x1 = self.get_col_x(index, end)
+        if index != l1:
+            # show the selected line break
+            x1 += self.font_size//3
+        rect = pygame.Rect(x + x0, y, x1 - x0, self.line_height)
+        pygame.draw.rect(self.surface, self.selection_color, rect)
+
+    def get_local_mouse_pos(self, mouse_x, mouse_y):
+        abs_x, abs_y = self.get_abs_pos()
+        return mouse_x - abs_x, mouse_y - abs_y
 
     def on_press(self, button):
         if button == pygame.BUTTON_LEFT:
             root = self.get_root()
             if isinstance(root, LameUI):
                 root.set_selected(self)
+            pos = self.get_pos_at(*self.get_local_mouse_pos(*self.get_press_pos()))
+            self.set_caret(*pos)
+            self.dragging = True
+
+    def handle_mouse_selected(self, *args):
+        if not self.dragging:
+            return
+        pos = self.get_pos_at(*self.get_local_mouse_pos(*args))
+        if pos != self.caret:
+            self.set_caret(*pos, extend=True)
+
+    def handle_wheel_event(self, event):
+        self.scroll_to(self.scroll_y - event.y*self.scroll_speed)
+        return True
 
     def handle_event(self, event):
-        # TODO: what to do when event wasnt handled
         if event.type == pygame.TEXTINPUT:
-            self.text += event.text
-            return
+            self.insert(event.text)
+            return True
 
         elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_BACKSPACE:
-                self.__delete_char()
-                self.delete_interval = self.__initial_delete_interval
-                self.deleting = True
+            key = event.key
+            ctrl = bool(event.mod & pygame.KMOD_CTRL)
+            shift = bool(event.mod & pygame.KMOD_SHIFT)
+            index, col = self.caret
+
+            if key == pygame.K_BACKSPACE:
+                self.start_repeat(key, lambda: self.delete_before(ctrl))
+            elif key == pygame.K_DELETE:
+                self.start_repeat(key, lambda: self.delete_after(ctrl))
+            elif key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.insert("\n")
+            elif key == pygame.K_TAB:
+                self.insert("    ")
+            elif key == pygame.K_LEFT:
+                self.start_repeat(key, lambda: self.move_left(ctrl, shift))
+            elif key == pygame.K_RIGHT:
+                self.start_repeat(key, lambda: self.move_right(ctrl, shift))
+            elif key == pygame.K_UP:
+                self.start_repeat(key, lambda: self.move_lines(-1, shift))
+            elif key == pygame.K_DOWN:
+                self.start_repeat(key, lambda: self.move_lines(1, shift))
+            elif key == pygame.K_PAGEUP:
+                self.move_lines(-self.get_page_lines(), shift)
+            elif key == pygame.K_PAGEDOWN:
+                self.move_lines(self.get_page_lines(), shift)
+            elif key == pygame.K_HOME:
+                self.set_caret(0 if ctrl else index, 0, shift)
+            elif key == pygame.K_END:
+                if ctrl:
+                    index = len(self.lines) - 1
+                self.set_caret(index, len(self.lines[index].text), shift)
+            elif ctrl and key == pygame.K_a:
+                self.select_all()
+            elif ctrl and key == pygame.K_c:
+                self.copy()
+            elif ctrl and key == pygame.K_x:
+                self.copy()
+                if not self.read_only:
+                    self.delete_selection()
+            elif ctrl and key == pygame.K_v:
+                self.paste()
+            else:
+                return False
+            return True
 
         elif event.type == pygame.KEYUP:
-            if event.key == pygame.K_BACKSPACE:
-                self.deleting = False
+            if event.key == self.repeat_key:
+                self.stop_repeat()
+                return True
+
+        return False
 
 
-class Button(Component):
-    def __init__(self, size, pos, color=None, name="", parent=None, text="", font_size=None, font_color=None, border_radius=0):
+class Button(Container):
+    __slots__ = ("hovered", "border_radius", "text", "_on_click")
+
+    def __init__(self, size, pos, color=None, name="", parent=None, text="", font_size=None, font_color=None, border_radius=0, font_face=None):
         super().__init__(size=size, pos=pos, bg_color=color, name=name, parent=parent)
         self.hovered = False
         self.border_radius = border_radius
+        self._on_click: Signal | None = None
 
-        self.components = []
-        self.sizer = Sizer(self)
         self.sizer.set_alignment(Alignment.CENTER)
 
         if font_size is None:
             font_size = self.size[1]//2
 
-        self.text = Text(text, font_size, font_color)
+        self.text = Text(text, font_size, font_color, font_face=font_face)
+        self.text.parent = self
         self.components.append(self.text)
 
-    def redraw(self):
-        self.sizer.calc_pos()
+    @property
+    def on_click(self) -> Signal:
+        # emitted with the mouse button on every press
+        if self._on_click is None:
+            self._on_click = Signal()
+        return self._on_click
 
-        rect = self.surface.get_rect()
+    def on_press(self, button):
+        super().on_press(button)
+        if self._on_click is not None:
+            self._on_click.emit(button)
 
-        pygame.draw.rect(self.surface, self.bg_color,
-                         rect, border_radius=self.border_radius)
+    def is_opaque(self):
+        # rounded corners are left transparent
+        return (not self.border_radius
+                and surfaces.is_opaque_color(self.bg_color)
+                and surfaces.is_opaque_color(self.highlight_color))
 
-        if self.hovered:
-            pygame.draw.rect(self.surface, self.highlight_color,
-                             rect, border_radius=self.border_radius)
+    def redraw(self):
+        # the highlight covers the background exactly, draw only one of them
+        color = self.highlight_color if self.hovered else self.bg_color
+        if self.border_radius:
+            pygame.draw.rect(self.surface, color, self.surface.get_rect(),
+                             border_radius=self.border_radius)
+        else:
+            self.surface.fill(color)
 
         self.surface.blit(self.text.get_surface(), self.text.pos)
 
-    def on_hover(self):
+    def on_hover_enter(self):
         self.hovered = True
+        self.invalidate()
+
+    def on_hover_leave(self):
+        self.hovered = False
+        self.invalidate()
 
 
 class Sizer:
     VERTICAL = 0
     HORIZONTAL = 1
 
-    def __init__(self, parent: Panel, direction: int = 0, space_between=0):
+    __slots__ = ("parent", "direction", "center_h", "center_v", "space_between")
+
+    def __init__(self, parent: Container, direction: int = 0, space_between=0):
         self.parent = parent
         self.direction = direction
         self.center_h = False
@@ -278,6 +1520,11 @@ class Sizer:
 
         self.space_between = space_between
 
+    def __deepcopy__(self, memo):
+        clone = copy.copy(self)
+        clone.parent = clone_value(self.parent, memo)
+        return clone
+
     def set_direction(self, direction: int):
         self.direction = direction
 
@@ -312,10 +1559,6 @@ class Sizer:
                 total_component_height += self.space_between
 
         for comp in self.parent.components:
-            if isinstance(comp, Panel):
-                comp.sizer.calc_pos()
-            comp.redraw()
-
             width, height = self.parent.size
             center_x = width/2
             center_y = height/2
@@ -348,8 +1591,11 @@ class Sizer:
 
 
 class Slider(Component):
+    __slots__ = ("knob_color", "slider_color", "min_value", "max_value", "value", "_on_change")
+
     def __init__(self, size, pos, bg_color=None, name="", parent=None, knob_color=None, slider_color=None, min_value=0, max_value=1, start_value=None):
         super().__init__(size, pos, bg_color=bg_color, name=name, parent=parent)
+        self._on_change: ChangeSignal | None = None
 
         self.knob_color = (0, 0, 255)
         self.slider_color = (255, 0, 0)
@@ -375,6 +1621,14 @@ class Slider(Component):
     def get_value(self):
         return ((self.max_value-self.min_value)*self.value)+self.min_value
 
+    def set_value(self, value):
+        value = (value-self.min_value)/(self.max_value-self.min_value)
+        value = max(0, min(1, value))
+        if value != self.value:
+            self.value = value
+            self.invalidate()
+            self.notify_change()
+
     def on_press(self, button):
         if button == pygame.BUTTON_LEFT:
             root = self.get_root()
@@ -395,13 +1649,18 @@ class Slider(Component):
         bar_width = width - knob_radius*2
         value = (mouse_x-(slider_x+knob_radius))/bar_width
         value = max(0, min(1, value))
-        self.value = value
+        if value != self.value:
+            self.value = value
+            self.invalidate()
+            self.notify_change()
 
-    def redraw(self):
-        rect = self.surface.get_rect()
-        self.surface.fill((0, 0, 0, 0), rect)
+    def is_opaque(self):
+        return (surfaces.is_opaque_color(self.bg_color)
+                and surfaces.is_opaque_color(self.slider_color)
+                and surfaces.is_opaque_color(self.knob_color))
 
-        pygame.draw.rect(self.surface, self.bg_color, rect)
+    def redraw(self):
+        self.surface.fill(self.bg_color)
 
         width, height = self.size
         knob_radius = height/2
@@ -422,35 +1681,89 @@ class Slider(Component):
                            (knob_x, knob_y), knob_radius)
 
 
-class Panel(Component):
-    def __init__(self, size, pos, bg_color=None, name="", parent=None, border_radius=0):
+class Panel(Container):
+    __slots__ = ("border_radius", "hit_index", "frozen")
+
+    def __init__(self, size, pos, bg_color=None, name="", parent=None, border_radius=0, frozen=False):
         super().__init__(size=size, pos=pos, bg_color=bg_color, name=name, parent=parent)
-        self.components: list[Component] = []
-        self.sizer = Sizer(self)
         self.border_radius = border_radius
+        # rebuilt lazily after the children are arranged again
+        self.hit_index: GridIndex | None = None
+        # only the panel keeps a surface, see set_frozen
+        self.frozen = frozen
+
+    def set_frozen(self, frozen):
+        # for subtrees that rarely change: the descendants give up their
+        # surfaces once composited into the panel, and a change to any of
+        # them repaints the whole subtree
+        if frozen == self.frozen:
+            return
+        self.frozen = frozen
+        if not frozen:
+            # the descendants need their surfaces back
+            for comp in self.get_descendants():
+                comp.dirty = True
+        self.invalidate()
+
+    def get_descendants(self) -> list[Component]:
+        descendants = []
+        stack = list(self.components)
+        while stack:
+            comp = stack.pop()
+            descendants.append(comp)
+            if isinstance(comp, Container):
+                stack.extend(comp.components)
+        return descendants
+
+    def paint(self, damage: list[pygame.Rect] | None = None, clip: pygame.Rect | None = None):
+        if not self.frozen:
+            super().paint(damage, clip)
+            return
+        clip = self.get_clip(clip)
+        if not self.dirty or self.batch_depth:
+            return
+        # repainted without being damaged, only the changed ones report
+        # damage
+        descendants = self.get_descendants()
+        for comp in descendants:
+            comp.dirty = True
+        super().paint(damage, clip)
+        for comp in descendants:
+            # text surfaces are shared renders, not owned
+            if not isinstance(comp, Text):
+                comp.surface = None
+                if isinstance(comp, Container):
+                    comp.clip = None
 
     def get_component_at(self, mouse_x, mouse_y) -> Component | None:
         pos_x, pos_y = self.get_abs_pos()
+        return self.get_component_at_local(mouse_x - pos_x, mouse_y - pos_y)
 
-        rect = pygame.Rect(pos_x, pos_y,
-                           self.size[0], self.size[1])
-        if not rect.collidepoint(mouse_x, mouse_y):
+    def get_component_at_local(self, x, y) -> Component | None:
+        width, height = self.size
+        if not (0 <= x < width and 0 <= y < height):
             return None
 
-        for comp in self.components:
+        if self.hit_index is None:
+            rects = [(comp.pos[0], comp.pos[1], comp.size[0], comp.size[1])
+                     for comp in self.components]
+            self.hit_index = GridIndex(self.size, rects)
 
-            pos_x, pos_y = comp.get_abs_pos()
-            comp_w, comp_h = comp.size
+        i = self.hit_index.query(x, y)
+        if i is None:
+            return self
 
-            rect = pygame.Rect(pos_x, pos_y, comp_w, comp_h)
+        comp = self.components[i]
+        if isinstance(comp, Panel):
+            comp_x, comp_y = comp.pos
+            return comp.get_component_at_local(x - comp_x, y - comp_y)
 
-            if rect.collidepoint(mouse_x, mouse_y):
-                if isinstance(comp, Panel):
-                    return comp.get_component_at(mouse_x, mouse_y)
+        return comp
 
-                return comp
-
-        return self
+    def arrange(self):
+        if self.needs_layout:
+            self.hit_index = None
+        super().arrange()
 
     def propagate_dt(self, dt):
         for component in self.components:
@@ -471,56 +1784,467 @@ class Panel(Component):
 
         return components
 
+    def get_component_by_name(self, name) -> Component | None:
+        for component in self.components:
+            if component.name == name:
+                return component
+
+            if isinstance(component, Panel):
+                found = component.get_component_by_name(name)
+                if found is not None:
+                    return found
+
+        return None
+
     def set_direction(self, direction: int):
         # direction : Sizer.VERTICAL | Sizer.HORIZONTAL
         self.sizer.set_direction(direction)
-        self.recalculate()
+        self.invalidate_layout()
 
     def set_space_between(self, value: int):
         self.sizer.space_between = value
-        self.recalculate()
+        self.invalidate_layout()
 
     def align(self, alignment: Alignment):
         self.sizer.set_alignment(alignment)
-        self.recalculate()
+        self.invalidate_layout()
 
     def get_direction(self) -> int:
         return self.sizer.direction
 
     def resize(self, size):
         self.size = size
-        self.surface = pygame.transform.scale(self.surface, size)
-        self.recalculate()
+        self.resize_surface()
+        self.invalidate_layout()
+        if self.parent is not None:
+            self.parent.invalidate_layout()
 
     def recalculate(self):
-        self.sizer.calc_pos()
-        self.redraw()
+        self.invalidate_layout()
+        self.update()
 
-    def redraw(self):
+    def is_opaque(self):
+        return not self.border_radius and surfaces.is_opaque_color(self.bg_color)
 
-        rect = self.surface.get_rect()
-        self.surface.fill((0, 0, 0, 0), rect)
-
-        pygame.draw.rect(self.surface, self.bg_color, rect,
-                         border_radius=self.border_radius)
+    def redraw(self):
+        if self.border_radius:
+            # children may have drawn into the corners last time
+            self.surface.fill((0, 0, 0, 0))
+            pygame.draw.rect(self.surface, self.bg_color, self.surface.get_rect(),
+                             border_radius=self.border_radius)
+        else:
+            self.surface.fill(self.bg_color)
+        clip = self.surface.get_clip()
         for comp in self.components:
-            comp.redraw()
-
-            self.surface.blit(comp.get_surface(), comp.pos)
+            surface = comp.get_surface()
+            # None until painted, children in a batch or culled may not be yet
+            if surface is not None and clip.colliderect(comp.pos, comp.size):
+                self.surface.blit(surface, comp.pos)
 
     def add(self, component: Component):
         component.parent = self
         self.components.append(component)
-        self.recalculate()
+        self.invalidate_layout()
+        root = self.get_root()
+        if isinstance(root, LameUI):
+            root.watch_process(component)
+
+    def add_many(self, components):
+        with self.batch():
+            for component in components:
+                self.add(component)
+
+    @contextmanager
+    def batch(self):
+        # changes inside only flag the tree, updates skip this subtree
+        # until the batch ends and the next update lays it out once
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                # the ancestors may have been updated around the batch,
+                # flag the path to it again
+                comp = self.parent
+                while comp is not None:
+                    comp.layout_dirty = comp.layout_dirty or self.layout_dirty
+                    comp.dirty = comp.dirty or self.dirty
+                    comp = comp.parent
+
+
+class ScrollPanel(Panel):
+    # rows all have the same height, only those intersecting the viewport
+    # exist as components and they are recycled while scrolling
+    # row_factory(size) -> Component
+    # bind_row(row, item, index) fills a new or recycled row with an item
+    __slots__ = ("row_height", "row_factory", "bind_row", "data", "scroll_offset", "scroll_speed", "rows",
+                 "row_pool", "drag_start", "scrollbar_width", "scrollbar_color")
+
+    def __init__(self, size, pos, row_height, row_factory, bind_row, data=None, bg_color=None, name="", parent=None, border_radius=0, scroll_speed=None):
+        super().__init__(size=size, pos=pos, bg_color=bg_color, name=name,
+                         parent=parent, border_radius=border_radius)
+        self.row_height = row_height
+        self.row_factory = row_factory
+        self.bind_row = bind_row
+
+        self.data = data
+        if self.data is None:
+            self.data = []
+
+        self.scroll_offset = 0
+        self.scroll_speed = scroll_speed
+        if self.scroll_speed is None:
+            self.scroll_speed = row_height*3
+
+        self.rows: dict[int, Component] = {}
+        self.row_pool: list[Component] = []
+        self.drag_start = None
+
+        self.scrollbar_width = 6
+        self.scrollbar_color = self.highlight_color
+
+        self.subscribe(pygame.MOUSEWHEEL, self.handle_wheel_event)
+        self.subscribe(pygame.MOUSEBUTTONDOWN, self.handle_press_event)
+        self.subscribe(pygame.MOUSEMOTION, self.handle_motion_event)
+        self.subscribe(pygame.MOUSEBUTTONUP, self.handle_release_event)
+
+    def add(self, component: Component):
+        assert False, "ScrollPanel rows come from row_factory"
+
+    def set_data(self, data):
+        self.data = data
+        self.refresh()
+
+    def refresh(self):
+        # rebind every visible row, for when items changed in place
+        for row in self.rows.values():
+            self.recycle_row(row)
+        self.rows.clear()
+        self.invalidate_layout()
+
+    def recycle_row(self, row):
+        # a pooled row is bound to another item next, it must not stay
+        # hovered or selected for the one it showed
+        root = self.get_root()
+        if isinstance(root, LameUI):
+            hovered = root.hovered_component
+            if hovered is not None and is_inside(hovered, row):
+                hovered.on_hover_leave()
+                root.hovered_component = None
+            selected = root.selected_component
+            if selected is not None and is_inside(selected, row):
+                root.set_selected(None)
+        self.row_pool.append(row)
+
+    def get_max_offset(self):
+        return max(0, len(self.data)*self.row_height - self.size[1])
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.get_max_offset()))
+        if offset == self.scroll_offset:
+            return
+        self.scroll_offset = offset
+        self.invalidate_layout()
+
+    def scroll_by(self, delta):
+        self.scroll_to(self.scroll_offset + delta)
+
+    def update_rows(self):
+        self.scroll_offset = max(0, min(self.scroll_offset, self.get_max_offset()))
+
+        width, height = self.size
+        first = int(self.scroll_offset // self.row_height)
+        last = min(len(self.data),
+                   math.ceil((self.scroll_offset + height) / self.row_height))
+
+        for index in list(self.rows):
+            if not first <= index < last:
+                self.recycle_row(self.rows.pop(index))
+
+        components = []
+        for index in range(first, last):
+            row = self.rows.get(index)
+            if row is None:
+                if self.row_pool:
+                    row = self.row_pool.pop()
+                else:
+                    row = self.row_factory((width, self.row_height))
+                    root = self.get_root()
+                    if isinstance(root, LameUI):
+                        root.watch_process(row)
+                row.parent = self
+                # the panel may have moved while the row sat in the pool
+                row.invalidate_abs_pos()
+                self.bind_row(row, self.data[index], index)
+                self.rows[index] = row
+            row.base_pos = (0, 0)
+            components.append(row)
+
+        # the sizer stacks the rows, the first one carries the partial scroll
+        if components:
+            components[0].base_pos = (0, first*self.row_height - self.scroll_offset)
+        self.components = components
+
+    def measure(self):
+        if self.needs_layout:
+            self.update_rows()
+        super().measure()
+
+    def is_opaque(self):
+        return super().is_opaque() and surfaces.is_opaque_color(self.scrollbar_color)
+
+    def redraw(self):
+        super().redraw()
+
+        width, height = self.size
+        content_height = len(self.data)*self.row_height
+        if content_height <= height:
+            return
+
+        thumb_h = max(height*height/content_height, self.scrollbar_width)
+        thumb_y = (height - thumb_h)*self.scroll_offset/self.get_max_offset()
+        rect = pygame.Rect(width - self.scrollbar_width, thumb_y,
+                           self.scrollbar_width, thumb_h)
+        pygame.draw.rect(self.surface, self.scrollbar_color, rect,
+                         border_radius=self.scrollbar_width//2)
+
+    def handle_wheel_event(self, event):
+        self.scroll_by(-event.y*self.scroll_speed)
+        return True
+
+    def handle_press_event(self, event):
+        # rows still get the press, dragging only starts on motion
+        if event.button == pygame.BUTTON_LEFT:
+            self.drag_start = (event.pos[1], self.scroll_offset)
+        return False
+
+    def handle_motion_event(self, event):
+        if self.drag_start is None or not event.buttons[0]:
+            return False
+        start_y, start_offset = self.drag_start
+        self.scroll_to(start_offset - (event.pos[1] - start_y))
+        return True
+
+    def handle_release_event(self, event):
+        self.drag_start = None
+        return False
 
 
 class LameUI(Panel):
+    # events sent to the selected component, bubbling up to the root
+    FOCUS_EVENTS = {pygame.KEYDOWN, pygame.KEYUP,
+                    pygame.TEXTINPUT, pygame.TEXTEDITING}
+    # events sent to the component under the mouse, bubbling up to the root
+    POINTER_EVENTS = {pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                      pygame.MOUSEMOTION, pygame.MOUSEWHEEL}
+
+    __slots__ = ("coalesce_motion", "selected_component", "hovered_component", "damage", "max_damage_rects",
+                 "profiler", "perf_overlay", "perf_overlay_rect", "scheduler", "running", "last_step",
+                 "press_pos", "processing")
+
     def __init__(self, size, pos, bg_color=None, name="", parent=None):
         super().__init__(size, pos, bg_color, name, parent)
 
+        self.coalesce_motion = True
+
         self.selected_component: Component | None = None
+        self.hovered_component: Component | None = None
+        # position of the press being handled by on_press, None otherwise
+        self.press_pos: tuple[int, int] | None = None
+        # areas repainted since the last draw_to, in draw_to surface coordinates
+        self.damage: list[pygame.Rect] = []
+        self.max_damage_rects = 16
+
+        self.profiler: profiling.FrameProfiler | None = None
+        self.perf_overlay: profiling.PerfOverlay | None = None
+        self.perf_overlay_rect: pygame.Rect | None = None
+
+        self.scheduler = Scheduler()
+        # components overriding process(dt), see watch_process
+        self.processing: dict[Component, None] = {}
+        self.running = False
+        self.last_step: int | None = None
+
+        self.subscribe(pygame.VIDEORESIZE, self.handle_resize_event)
+        self.subscribe(pygame.MOUSEBUTTONDOWN, self.handle_mouse_press_event)
+        self.subscribe(pygame.MOUSEBUTTONUP, self.handle_mouse_release_event)
+
+    def __deepcopy__(self, memo):
+        # timers, profiling and mouse state belong to the running ui, the
+        # copy starts without them
+        memo[id(self.scheduler)] = Scheduler(self.scheduler.get_time)
+        memo[id(self.processing)] = {}
+        for value in (self.profiler, self.perf_overlay, self.selected_component, self.hovered_component):
+            if value is not None:
+                memo.setdefault(id(value), None)
+        clone = super().__deepcopy__(memo)
+        # nothing of the copy is on screen yet
+        clone.damage = [pygame.Rect(self.pos, self.size)]
+        clone.perf_overlay_rect = None
+        clone.running = False
+        clone.last_step = None
+        for component in clone.components:
+            clone.watch_subtree(component)
+        return clone
+
+    def enable_profiling(self, history=240, overlay=False) -> profiling.FrameProfiler:
+        # timings are recorded per draw_to call, counts go to the last
+        # enabled LameUI when there are several
+        self.profiler = profiling.FrameProfiler(history)
+        profiling.active = self.profiler
+        self.set_perf_overlay(overlay)
+        return self.profiler
+
+    def disable_profiling(self):
+        if profiling.active is self.profiler:
+            profiling.active = None
+        self.profiler = None
+        self.set_perf_overlay(False)
+
+    def set_perf_overlay(self, overlay):
+        # overlay: True, False or a PerfOverlay
+        if overlay is True:
+            overlay = profiling.PerfOverlay()
+        elif overlay is False:
+            overlay = None
+        self.perf_overlay = overlay
+        # the overlay sits on top of the ui, repaint what it covered
+        if self.perf_overlay_rect is not None:
+            self.damage.append(self.perf_overlay_rect)
+            self.perf_overlay_rect = None
+
+    def get_perf_stats(self):
+        if self.profiler is None:
+            return None
+        return self.profiler.get_stats()
+
+    def process(self, dt):
+        profiler = self.profiler
+        if profiler is not None:
+            start = time.perf_counter()
+
+        # components register timers and animations with the scheduler
+        # instead of being polled, the tree is not walked
+        self.scheduler.update()
+
+        for component in list(self.processing):
+            if component.get_root() is self:
+                component.process(dt)
+            else:
+                del self.processing[component]
+
+        if profiler is not None:
+            profiler.add_time("process", time.perf_counter() - start)
+
+    def watch_process(self, component):
+        # called for components added to the tree, those overriding
+        # process(dt) get it called from process on every frame, a panel
+        # overriding it propagates to its children itself
+        ancestor = component.parent
+        while ancestor is not None and ancestor is not self:
+            if overrides_process(ancestor):
+                return
+            ancestor = ancestor.parent
+        self.watch_subtree(component)
+
+    def watch_subtree(self, component):
+        if overrides_process(component):
+            self.processing[component] = None
+        elif isinstance(component, Panel):
+            for child in component.components:
+                self.watch_subtree(child)
+
+    def set_timer(self, delay, callback, repeat=False) -> Timer:
+        # callback runs from process, every delay ms when repeat is set
+        if repeat:
+            return self.scheduler.call_every(delay, callback)
+        return self.scheduler.call_later(delay, callback)
+
+    def animate(self, setter, start, end, duration, easing=ease_in_out_quad, on_done=None) -> Tween:
+        # e.g. animate(slider.set_value, 0, 255, 300) or
+        # animate(text.set_font_color, (255, 0, 0), (0, 0, 255), 500)
+        return self.scheduler.tween(setter, start, end, duration, easing, on_done)
+
+    def get_idle_timeout(self, now):
+        # ms the loop can sleep before something changes, None for
+        # until the next event
+        if self.dirty or self.layout_dirty or self.processing:
+            return 0
+
+        deadline = self.scheduler.get_next_deadline()
+        if deadline is None:
+            return None
+        return max(deadline - now, 0)
+
+    def step(self, surface: pygame.Surface, max_fps=60) -> list[pygame.event.Event]:
+        # one iteration of the managed loop: sleeps in pygame.event.wait
+        # until an event or the next deadline, then runs a frame and
+        # returns the events nothing consumed
+        now = pygame.time.get_ticks()
+        timeout = self.get_idle_timeout(now)
+
+        # never run frames faster than max_fps
+        if self.last_step is not None and max_fps:
+            frame_left = 1000 // max_fps - (now - self.last_step)
+            if timeout is not None:
+                timeout = max(timeout, frame_left)
+
+        if timeout is None:
+            events = [pygame.event.wait()]
+        elif timeout > 0:
+            event = pygame.event.wait(timeout)
+            events = [] if event.type == pygame.NOEVENT else [event]
+        else:
+            events = []
+
+        if self.last_step is not None and max_fps:
+            # an event can end the wait before the frame is due, wait the
+            # rest out so the events in between are handled together
+            frame_left = 1000 // max_fps - (pygame.time.get_ticks() - self.last_step)
+            if frame_left > 0:
+                pygame.time.wait(frame_left)
+        events.extend(pygame.event.get())
+
+        now = pygame.time.get_ticks()
+        dt = 0 if self.last_step is None else now - self.last_step
+        self.last_step = now
+
+        unhandled = self.handle_events(events)
+        # timers and animations first, hover is resolved against what
+        # they moved
+        self.process(dt)
+        self.process_mouse_pos()
+
+        rects = self.draw_to(surface, dirty_rects=True)
+        if rects and surface is pygame.display.get_surface():
+            pygame.display.update(rects)
+
+        return unhandled
+
+    def run(self, surface: pygame.Surface, max_fps=60, on_event=None):
+        # on_event(event) gets the events the ui did not consume, the loop
+        # ends on QUIT or stop()
+        self.running = True
+        while self.running:
+            for event in self.step(surface, max_fps):
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif on_event is not None:
+                    on_event(event)
+
+    def stop(self):
+        self.running = False
 
     def process_mouse_pos(self):
+        # hit test against this frame's layout, events may have moved
+        # things or created the components under the pointer
+        self.layout()
+
+        profiler = self.profiler
+        if profiler is not None:
+            start = time.perf_counter()
+
         mouse_x, mouse_y = pygame.mouse.get_pos()
 
         if self.selected_component is not None:
@@ -528,35 +2252,77 @@ class LameUI(Panel):
 
         hovered_component = self.get_component_at(mouse_x, mouse_y)
 
-        if isinstance(hovered_component, Button):
-            hovered_component.hovered = True
+        if hovered_component is not self.hovered_component:
+            if self.hovered_component is not None:
+                self.hovered_component.on_hover_leave()
+            self.hovered_component = hovered_component
+            if hovered_component is not None:
+                hovered_component.on_hover_enter()
+
+        if hovered_component is not None:
+            hovered_component.on_hover()
+
+        if profiler is not None:
+            profiler.add_time("mouse", time.perf_counter() - start)
 
-        self.recalculate()
+        self.update()
 
-        buttons: list[Button] = self.get_all_components_of_type(Button)
-        for button in buttons:
-            button.hovered = False
+    def handle_events(self, events: list[pygame.event.Event] | None = None) -> list[pygame.event.Event]:
+        # events: the frame's events if the app already called
+        # pygame.event.get(), returns the events nothing consumed
+        if events is None:
+            events = pygame.event.get()
 
-    def handle_events(self):
-        # TODO: what to do when children doesnt handle event
-        for event in pygame.event.get():
-            if event.type == pygame.VIDEORESIZE:
-                self.resize(event.size)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                self.on_mouse_press(event.button)
-            elif event.type == pygame.MOUSEBUTTONUP:
-                self.on_mouse_release(event.button)
+        profiler = self.profiler
+        if profiler is not None:
+            start = time.perf_counter()
 
-            elif event.type == pygame.KEYDOWN:
-                if isinstance(self.selected_component, TextInput):
-                    self.selected_component.handle_event(event)
-            elif event.type == pygame.KEYUP:
-                if isinstance(self.selected_component, TextInput):
-                    self.selected_component.handle_event(event)
+        if self.coalesce_motion:
+            events = coalesce_mouse_motion(events)
 
-            elif event.type == pygame.TEXTINPUT:
-                if isinstance(self.selected_component, TextInput):
-                    self.selected_component.handle_event(event)
+        unhandled = []
+        for event in events:
+            if not self.dispatch_event(event):
+                unhandled.append(event)
+
+        if profiler is not None:
+            profiler.add_time("events", time.perf_counter() - start)
+        return unhandled
+
+    def get_event_target(self, event) -> Component:
+        if event.type in LameUI.FOCUS_EVENTS:
+            if self.selected_component is not None:
+                return self.selected_component
+
+        elif event.type in LameUI.POINTER_EVENTS:
+            pos = getattr(event, "pos", None)
+            if pos is None:
+                pos = pygame.mouse.get_pos()
+            target = self.get_component_at(*pos)
+            if target is not None:
+                return target
+
+        return self
+
+    def dispatch_event(self, event) -> bool:
+        comp = self.get_event_target(event)
+        while comp is not None:
+            if comp.call_handlers(event):
+                return True
+            comp = comp.parent
+        return False
+
+    def handle_resize_event(self, event):
+        self.resize(event.size)
+        return True
+
+    def handle_mouse_press_event(self, event):
+        self.on_mouse_press(event.button, event.pos)
+        return True
+
+    def handle_mouse_release_event(self, event):
+        self.on_mouse_release(event.button)
+        return True
 
     def set_selected(self, component):
         if self.selected_component is not None:
@@ -566,12 +2332,20 @@ class LameUI(Panel):
         if self.selected_component is not None:
             self.selected_component.on_select()
 
-    def on_mouse_press(self, button):
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+    def on_mouse_press(self, button, pos=None):
+        if pos is None:
+            pos = pygame.mouse.get_pos()
+        mouse_x, mouse_y = pos
         hovered_component = self.get_component_at(mouse_x, mouse_y)
 
         if hovered_component is not None:
-            hovered_component.on_press(button)
+            # on_press only gets the button, the position is read from
+            # press_pos while it runs
+            self.press_pos = pos
+            try:
+                hovered_component.on_press(button)
+            finally:
+                self.press_pos = None
         else:
             self.set_selected(None)
 
@@ -584,5 +2358,89 @@ class LameUI(Panel):
         # if hovered_component is not None:
             # hovered_component.on_press(button)
 
-    def draw_to(self, surface: pygame.Surface):
-        surface.blit(self.get_surface(), self.pos)
+    def layout(self):
+        # measure and arrange what changed, without painting
+        if self.is_batching() or not self.layout_dirty:
+            return
+        profiler = self.profiler
+        if profiler is not None:
+            start = time.perf_counter()
+        self.measure()
+        self.arrange()
+        if profiler is not None:
+            profiler.add_time("layout", time.perf_counter() - start)
+
+    def update(self, damage: list[pygame.Rect] | None = None):
+        if self.is_batching():
+            return
+        if damage is None:
+            damage = self.damage
+
+        self.layout()
+        profiler = self.profiler
+        if profiler is None:
+            self.paint(damage)
+        else:
+            start = time.perf_counter()
+            self.paint(damage)
+            profiler.add_time("paint", time.perf_counter() - start)
+
+        if len(damage) > self.max_damage_rects:
+            damage[:] = merge_rects(damage, self.max_damage_rects)
+
+    def draw_to(self, surface: pygame.Surface, dirty_rects=False) -> list[pygame.Rect] | None:
+        # dirty_rects: only blit the areas that changed since the last call
+        # and return them for pygame.display.update(rects)
+
+        # once per frame, update also runs from process_mouse_pos, what the
+        # callbacks change is painted in this frame
+        flush_signals()
+        self.update()
+        if self.surface is None:
+            # batched before the first paint
+            return [] if dirty_rects else None
+
+        profiler = self.profiler
+        if profiler is not None:
+            start = time.perf_counter()
+
+        if not dirty_rects:
+            self.damage.clear()
+            surface.blit(self.get_surface(), self.pos)
+            rects = None
+        else:
+            bounds = self.get_abs_rect()
+            rects = []
+            for rect in merge_rects(self.damage, self.max_damage_rects):
+                # positions can be fractional, pad a pixel for rounding
+                rect = rect.inflate(2, 2).clip(bounds)
+                if rect.width and rect.height:
+                    rects.append(rect)
+            self.damage.clear()
+
+            for rect in rects:
+                area = rect.move(-self.pos[0], -self.pos[1])
+                surface.blit(self.get_surface(), rect.topleft, area)
+
+        if profiler is not None:
+            profiler.add_time("blit", time.perf_counter() - start)
+            if self.perf_overlay is not None:
+                rect = self.draw_perf_overlay(surface, dirty_rects)
+                if rects is not None:
+                    rects.append(rect)
+            profiler.end_frame()
+
+        return rects
+
+    def draw_perf_overlay(self, surface: pygame.Surface, dirty_rects) -> pygame.Rect:
+        old_rect = self.perf_overlay_rect
+        if dirty_rects and old_rect is not None:
+            # restore the ui under last frame's overlay, it has alpha
+            area = old_rect.move(-self.pos[0], -self.pos[1])
+            surface.blit(self.get_surface(), old_rect.topleft, area)
+
+        rect = self.perf_overlay.draw(surface, self.profiler)
+        self.perf_overlay_rect = rect
+        if old_rect is not None:
+            return rect.union(old_rect)
+        return rect
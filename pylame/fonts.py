@@ -0,0 +1,144 @@
+from __future__ import annotations
+from collections import OrderedDict
+import pygame
+
+from . import surfaces
+
+
+class FontCache:
+    def __init__(self, max_fonts=32):
+        self.max_fonts = max_fonts
+        self.fonts: OrderedDict[tuple, pygame.font.Font] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, face=None, size=10, bold=False, italic=False) -> pygame.font.Font:
+        # face: path to a font file, None for pygame's default font
+        key = (face, size, bold, italic)
+
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            self.fonts.move_to_end(key)
+            return font
+
+        self.misses += 1
+        if face is None:
+            face = pygame.font.get_default_font()
+        font = pygame.font.Font(face, size)
+        font.set_bold(bold)
+        font.set_italic(italic)
+
+        self.fonts[key] = font
+        while len(self.fonts) > self.max_fonts:
+            self.fonts.popitem(last=False)
+            self.evictions += 1
+
+        return font
+
+    def set_max_fonts(self, max_fonts):
+        assert max_fonts > 0
+        self.max_fonts = max_fonts
+        while len(self.fonts) > self.max_fonts:
+            self.fonts.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.fonts.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "fonts": len(self.fonts),
+            "max_fonts": self.max_fonts,
+        }
+
+
+class TextCache:
+    # rendered surfaces are shared between callers and must not be drawn on
+    def __init__(self, max_bytes=8*1024*1024):
+        self.max_bytes = max_bytes
+        self.surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, face=None, size=10, color=(240, 240, 240), bold=False, italic=False, antialias=True) -> pygame.Surface:
+        key = (text, face, size, tuple(color), bold, italic, antialias)
+
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        font = font_cache.get(face, size, bold, italic)
+        surface = surfaces.convert(font.render(text, antialias, color))
+
+        surface_bytes = self.get_surface_bytes(surface)
+        if surface_bytes > self.max_bytes:
+            return surface
+
+        self.surfaces[key] = surface
+        self.bytes += surface_bytes
+        self.evict()
+
+        return surface
+
+    @staticmethod
+    def get_surface_bytes(surface: pygame.Surface):
+        return surface.get_pitch() * surface.get_height()
+
+    def evict(self):
+        while self.bytes > self.max_bytes:
+            key, surface = self.surfaces.popitem(last=False)
+            self.bytes -= self.get_surface_bytes(surface)
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        assert max_bytes > 0
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "surfaces": len(self.surfaces),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+font_cache = FontCache()
+text_cache = TextCache()
+
+
+def get_font(face=None, size=10, bold=False, italic=False) -> pygame.font.Font:
+    return font_cache.get(face, size, bold, italic)
+
+
+def render_text(text, face=None, size=10, color=(240, 240, 240), bold=False, italic=False, antialias=True) -> pygame.Surface:
+    return text_cache.render(text, face, size, color, bold, italic, antialias)
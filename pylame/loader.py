@@ -0,0 +1,188 @@
+from __future__ import annotations
+import json
+import os
+
+from .components import (Alignment, Button, Component, LameUI, Panel, Sizer,
+                         Slider, Text, TextArea, TextInput)
+
+
+# "type" in a description -> class, keys other than the layout ones below
+# are passed to its constructor
+TYPES: dict[str, type] = {
+    "LameUI": LameUI,
+    "Panel": Panel,
+    "Button": Button,
+    "Slider": Slider,
+    "TextInput": TextInput,
+    "TextArea": TextArea,
+    "Text": Text,
+}
+
+DIRECTIONS = {
+    "vertical": Sizer.VERTICAL,
+    "horizontal": Sizer.HORIZONTAL,
+}
+
+ALIGNMENTS = {
+    "center": Alignment.CENTER,
+    "center_horizontal": Alignment.CENTER_HORIZONTAL,
+    "center_vertical": Alignment.CENTER_VERTICAL,
+}
+
+LAYOUT_KEYS = {"type", "children", "direction", "align", "space_between"}
+
+
+def register_type(name, cls):
+    TYPES[name] = cls
+
+
+def to_tuples(value):
+    # json has no tuples, sizes, positions and colors are compared as tuples
+    if isinstance(value, list):
+        return tuple(to_tuples(v) for v in value)
+    return value
+
+
+class Template:
+    # a parsed description, build makes a new tree from it
+    def __init__(self, cls, kwargs, direction=None, alignment=None, space_between=None, children=None):
+        self.cls = cls
+        self.kwargs = kwargs
+        self.direction = direction
+        self.alignment = alignment
+        self.space_between = space_between
+        self.children: list[Template] = children or []
+
+    @staticmethod
+    def parse(description: dict) -> Template:
+        # descriptions come from outside, checked even under python -O
+        if not isinstance(description, dict):
+            raise ValueError(f"expected an object, got {description!r}")
+        type_name = description.get("type")
+        if type_name not in TYPES:
+            raise ValueError(f"unknown component type {type_name!r}")
+        cls = TYPES[type_name]
+
+        kwargs = {key: to_tuples(value) for key, value in description.items()
+                  if key not in LAYOUT_KEYS}
+        if cls is not Text:
+            kwargs.setdefault("pos", (0, 0))
+
+        direction = description.get("direction")
+        if direction is not None:
+            if direction not in DIRECTIONS:
+                raise ValueError(f"unknown direction {direction!r}")
+            direction = DIRECTIONS[direction]
+
+        alignment = description.get("align")
+        if alignment is not None:
+            if alignment not in ALIGNMENTS:
+                raise ValueError(f"unknown alignment {alignment!r}")
+            alignment = ALIGNMENTS[alignment]
+
+        children = [Template.parse(child) for child in description.get("children", [])]
+        if children and not issubclass(cls, Panel):
+            raise ValueError(f"{type_name} can not have children")
+
+        return Template(cls, kwargs, direction, alignment,
+                        description.get("space_between"), children)
+
+    def fill(self, panel: Panel):
+        sizer = panel.sizer
+        if self.direction is not None:
+            sizer.set_direction(self.direction)
+        if self.alignment is not None:
+            sizer.set_alignment(self.alignment)
+        if self.space_between is not None:
+            sizer.space_between = self.space_between
+
+        for child in self.children:
+            component = child.cls(**child.kwargs)
+            if isinstance(component, Panel):
+                child.fill(component)
+            panel.add(component)
+
+    def build(self) -> Component:
+        # the whole tree is added in one batch, the first update lays it
+        # out once
+        component = self.cls(**self.kwargs)
+        if isinstance(component, Panel):
+            with component.batch():
+                self.fill(component)
+        return component
+
+
+class Loader:
+    # keeps a laid out and painted tree per description, loading the same
+    # one again returns a clone of it instead of parsing and building
+    def __init__(self):
+        self.templates: dict[object, Template] = {}
+        self.prebuilt: dict[object, Component] = {}
+        self.file_mtimes: dict[str, float] = {}
+
+    def get_template(self, key, parse) -> Template:
+        template = self.templates.get(key)
+        if template is None:
+            template = parse()
+            self.templates[key] = template
+        return template
+
+    def instantiate(self, key, template: Template) -> Component:
+        tree = self.prebuilt.get(key)
+        if tree is None:
+            tree = template.build()
+            tree.update()
+            self.prebuilt[key] = tree
+        return tree.clone()
+
+    def load(self, description: dict, key=None) -> Component:
+        # without a key a dict is parsed and built every time, it may have
+        # changed since the last call
+        if key is None:
+            return Template.parse(description).build()
+        template = self.get_template(key, lambda: Template.parse(description))
+        return self.instantiate(key, template)
+
+    def load_json(self, text) -> Component:
+        key = ("json", text)
+        template = self.get_template(key, lambda: Template.parse(json.loads(text)))
+        return self.instantiate(key, template)
+
+    def load_file(self, path) -> Component:
+        # a file edited since it was cached is parsed again
+        path = os.path.abspath(path)
+        key = ("file", path)
+        mtime = os.path.getmtime(path)
+        if self.file_mtimes.get(path) != mtime:
+            self.forget(key)
+            self.file_mtimes[path] = mtime
+
+        def parse():
+            with open(path) as f:
+                return Template.parse(json.load(f))
+        template = self.get_template(key, parse)
+        return self.instantiate(key, template)
+
+    def forget(self, key):
+        self.templates.pop(key, None)
+        self.prebuilt.pop(key, None)
+
+    def clear(self):
+        self.templates.clear()
+        self.prebuilt.clear()
+        self.file_mtimes.clear()
+
+
+loader = Loader()
+
+
+def load(description: dict, key=None) -> Component:
+    return loader.load(description, key)
+
+
+def load_json(text) -> Component:
+    return loader.load_json(text)
+
+
+def load_file(path) -> Component:
+    return loader.load_file(path)
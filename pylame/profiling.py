@@ -0,0 +1,158 @@
+from __future__ import annotations
+from collections import deque, Counter
+import time
+import pygame
+
+from . import surfaces
+from .fonts import get_font
+
+
+# profiler that components report redraws, text renders and text cache
+# hits, surface allocations and children culled outside the visible area
+# to, set by LameUI.enable_profiling
+active: FrameProfiler | None = None
+
+
+def count(kind, component):
+    if active is not None:
+        active.count(kind, component)
+
+
+class FrameProfiler:
+    SECTIONS = ("events", "mouse", "process", "layout", "paint", "blit")
+    KINDS = ("redraw", "text_render", "text_cache_hit", "surface_alloc", "culled")
+
+    def __init__(self, history=240):
+        self.history = history
+        self.timings: dict[str, deque[float]] = {
+            section: deque(maxlen=history) for section in FrameProfiler.SECTIONS + ("frame", "interval")}
+
+        self.current = dict.fromkeys(FrameProfiler.SECTIONS, 0.0)
+        self.current_counts: Counter[tuple] = Counter()
+        self.last_counts: Counter[tuple] = Counter()
+        self.total_counts: Counter[tuple] = Counter()
+
+        self.frames = 0
+        self.last_frame_end = None
+
+    def add_time(self, section, seconds):
+        self.current[section] += seconds
+
+    def count(self, kind, component):
+        self.current_counts[(kind, type(component).__name__, component.name)] += 1
+
+    def end_frame(self):
+        now = time.perf_counter()
+        frame = 0.0
+        for section, seconds in self.current.items():
+            self.timings[section].append(seconds)
+            frame += seconds
+            self.current[section] = 0.0
+        self.timings["frame"].append(frame)
+        if self.last_frame_end is not None:
+            self.timings["interval"].append(now - self.last_frame_end)
+        self.last_frame_end = now
+
+        self.last_counts = self.current_counts
+        self.total_counts.update(self.current_counts)
+        self.current_counts = Counter()
+        self.frames += 1
+
+    def reset(self):
+        for samples in self.timings.values():
+            samples.clear()
+        self.total_counts.clear()
+        self.frames = 0
+        self.last_frame_end = None
+
+    @staticmethod
+    def percentile(samples, p):
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        i = min(len(ordered) - 1, int(p/100 * len(ordered)))
+        return ordered[i]
+
+    def get_timing(self, section):
+        samples = self.timings[section]
+        if not samples:
+            return {"last": 0.0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "last": samples[-1],
+            "mean": sum(samples) / len(samples),
+            "p50": self.percentile(samples, 50),
+            "p90": self.percentile(samples, 90),
+            "p99": self.percentile(samples, 99),
+            "max": max(samples),
+        }
+
+    def get_counts(self, kind, last_frame=True):
+        # "Class:name" -> count, for the last frame or since reset
+        counts = self.last_counts if last_frame else self.total_counts
+        result = {}
+        for (count_kind, class_name, name), n in counts.items():
+            if count_kind != kind:
+                continue
+            key = f"{class_name}:{name}" if name else class_name
+            result[key] = result.get(key, 0) + n
+        return result
+
+    def get_stats(self):
+        # timings in seconds
+        return {
+            "frames": self.frames,
+            "timings": {section: self.get_timing(section) for section in self.timings},
+            "last_frame": {kind: self.get_counts(kind) for kind in self.KINDS},
+            "total": {kind: self.get_counts(kind, False) for kind in self.KINDS},
+        }
+
+
+class PerfOverlay:
+    # drawn by LameUI.draw_to on top of the ui, outside the component tree
+    def __init__(self, pos=(4, 4), font_size=14, font_color=(255, 255, 0), bg_color=(0, 0, 0, 180), refresh_interval=250):
+        self.pos = pos
+        self.font_size = font_size
+        self.font_color = font_color
+        self.bg_color = bg_color
+        # ms between text updates, the numbers are unreadable every frame
+        self.refresh_interval = refresh_interval
+
+        self.surface: pygame.Surface | None = None
+        self.last_refresh = None
+
+    def get_lines(self, profiler: FrameProfiler):
+        lines = []
+        frame = profiler.get_timing("frame")
+        lines.append(f"frame {frame['last']*1000:6.2f} ms  p90 {frame['p90']*1000:6.2f}"
+                     f"  p99 {frame['p99']*1000:6.2f}")
+        for section in FrameProfiler.SECTIONS:
+            timing = profiler.get_timing(section)
+            lines.append(f"{section:<8} {timing['mean']*1000:6.2f} ms  p90 {timing['p90']*1000:6.2f}")
+
+        redraws = sum(profiler.get_counts("redraw").values())
+        renders = sum(profiler.get_counts("text_render").values())
+        allocs = sum(profiler.get_counts("surface_alloc").values())
+        culled = sum(profiler.get_counts("culled").values())
+        lines.append(f"redraws {redraws}  text {renders}  surfaces {allocs}  culled {culled}")
+        return lines
+
+    def refresh(self, profiler: FrameProfiler):
+        font = get_font(None, self.font_size)
+        renders = [font.render(line, True, self.font_color)
+                   for line in self.get_lines(profiler)]
+
+        width = max(render.get_width() for render in renders) + 8
+        height = sum(render.get_height() for render in renders) + 8
+        self.surface = surfaces.new_surface((width, height))
+        self.surface.fill(self.bg_color)
+        y = 4
+        for render in renders:
+            self.surface.blit(render, (4, y))
+            y += render.get_height()
+
+    def draw(self, surface: pygame.Surface, profiler: FrameProfiler) -> pygame.Rect:
+        now = pygame.time.get_ticks()
+        if self.surface is None or now - self.last_refresh >= self.refresh_interval:
+            self.refresh(profiler)
+            self.last_refresh = now
+        return surface.blit(self.surface, self.pos)
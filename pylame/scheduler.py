@@ -0,0 +1,181 @@
+from __future__ import annotations
+import heapq
+import itertools
+import pygame
+
+
+def linear(t):
+    return t
+
+
+def ease_in_quad(t):
+    return t*t
+
+
+def ease_out_quad(t):
+    return t*(2 - t)
+
+
+def ease_in_out_quad(t):
+    if t < 0.5:
+        return 2*t*t
+    return -1 + (4 - 2*t)*t
+
+
+def ease_out_cubic(t):
+    t -= 1
+    return t*t*t + 1
+
+
+def interpolate(start, end, t):
+    # numbers, or tuples of numbers such as positions and colors
+    if isinstance(start, tuple):
+        return tuple(a + (b - a)*t for a, b in zip(start, end))
+    return start + (end - start)*t
+
+
+class Timer:
+    def __init__(self, deadline, callback, interval=None):
+        self.deadline = deadline
+        self.callback = callback
+        # ms between calls for repeating timers, None fires once
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Animation:
+    # runs on every scheduler update until finished or cancelled
+    def __init__(self, callback):
+        # callback(dt) returns True when the animation is over
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def step(self, now, dt) -> bool:
+        return self.callback(dt)
+
+
+class Tween(Animation):
+    def __init__(self, setter, start, end, duration, easing=ease_in_out_quad, on_done=None, start_time=0):
+        super().__init__(None)
+        self.setter = setter
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.easing = easing
+        self.on_done = on_done
+        self.start_time = start_time
+
+    def step(self, now, dt) -> bool:
+        if self.duration <= 0:
+            t = 1
+        else:
+            t = min((now - self.start_time) / self.duration, 1)
+
+        if t >= 1:
+            self.setter(self.end)
+            if self.on_done is not None:
+                self.on_done()
+            return True
+
+        self.setter(interpolate(self.start, self.end, self.easing(t)))
+        return False
+
+
+class Scheduler:
+    # times are in ms on the clock of get_time, pygame.time.get_ticks
+    # unless another one is given
+    def __init__(self, get_time=None):
+        self.get_time = get_time
+        if self.get_time is None:
+            self.get_time = pygame.time.get_ticks
+
+        self.timers: list[tuple[int, int, Timer]] = []
+        self.counter = itertools.count()
+        self.animations: list[Animation] = []
+        self.last_update: int | None = None
+
+    def push(self, timer: Timer):
+        heapq.heappush(self.timers, (timer.deadline, next(self.counter), timer))
+
+    def call_later(self, delay, callback) -> Timer:
+        timer = Timer(self.get_time() + delay, callback)
+        self.push(timer)
+        return timer
+
+    def call_every(self, interval, callback, delay=None) -> Timer:
+        # delay: ms before the first call, interval by default
+        assert interval > 0
+        if delay is None:
+            delay = interval
+        timer = Timer(self.get_time() + delay, callback, interval)
+        self.push(timer)
+        return timer
+
+    def call_every_frame(self, callback) -> Animation:
+        # callback(dt) on each update while the ui keeps running frames,
+        # returning True stops it
+        animation = Animation(callback)
+        self.animations.append(animation)
+        return animation
+
+    def tween(self, setter, start, end, duration, easing=ease_in_out_quad, on_done=None) -> Tween:
+        # setter(value) gets the eased value between start and end on
+        # every frame for duration ms
+        tween = Tween(setter, start, end, duration, easing,
+                      on_done, self.get_time())
+        self.animations.append(tween)
+        return tween
+
+    def is_animating(self):
+        self.animations = [animation for animation in self.animations
+                           if not animation.cancelled]
+        return bool(self.animations)
+
+    def get_next_deadline(self):
+        if self.is_animating():
+            return self.get_time()
+
+        while self.timers and self.timers[0][2].cancelled:
+            heapq.heappop(self.timers)
+        if not self.timers:
+            return None
+        return self.timers[0][0]
+
+    def update(self, now=None):
+        if now is None:
+            now = self.get_time()
+        dt = 0 if self.last_update is None else now - self.last_update
+        self.last_update = now
+
+        while self.timers and self.timers[0][0] <= now:
+            deadline, _, timer = heapq.heappop(self.timers)
+            if timer.cancelled:
+                continue
+
+            timer.callback()
+
+            if timer.interval is not None and not timer.cancelled:
+                # skip missed periods instead of firing them in a burst
+                timer.deadline += timer.interval
+                if timer.deadline <= now:
+                    timer.deadline = now + timer.interval
+                self.push(timer)
+
+        if not self.animations:
+            return
+
+        # animations started from a callback run from the next update
+        animations = self.animations
+        self.animations = []
+        for animation in animations:
+            if animation.cancelled:
+                continue
+            if animation.step(now, dt):
+                continue
+            self.animations.append(animation)
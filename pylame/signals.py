@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+
+# change signals and bindings waiting for flush, LameUI.draw_to flushes
+# them once per frame before laying it out
+pending: list = []
+
+
+def flush():
+    # callbacks may change more values, those are delivered in the same flush
+    global pending
+    while pending:
+        queued, pending = pending, []
+        for item in queued:
+            item.fire()
+
+
+class Signal:
+    # callbacks get the emitted values right away, connections belong to
+    # the owner and are not copied with it
+    __slots__ = ("callbacks",)
+
+    def __init__(self):
+        self.callbacks: list = []
+
+    def __deepcopy__(self, memo):
+        return Signal()
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+        return callback
+
+    def disconnect(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    def emit(self, *args):
+        # a copy, callbacks may disconnect themselves
+        for callback in self.callbacks[:]:
+            callback(*args)
+
+
+class ChangeSignal(Signal):
+    # emitted at most once per frame from flush with owner.get_value(),
+    # not when owner.get_change_key() is back to what it was at the last
+    # emit, the value is only built when it is emitted
+    __slots__ = ("owner", "queued", "last_key", "bare_callbacks")
+
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+        self.queued = False
+        self.last_key = owner.get_change_key()
+        # called without the value, which is then not built at all
+        self.bare_callbacks: list = []
+
+    def __deepcopy__(self, memo):
+        # the owner's copy may not have all its slots set yet
+        clone = ChangeSignal.__new__(ChangeSignal)
+        Signal.__init__(clone)
+        clone.owner = memo.get(id(self.owner), self.owner)
+        clone.queued = False
+        clone.last_key = self.last_key
+        clone.bare_callbacks = []
+        return clone
+
+    def connect(self, callback, with_value=True):
+        # with_value=False for callbacks that read only what they need,
+        # such as the visible part of a long text
+        if with_value:
+            return super().connect(callback)
+        self.bare_callbacks.append(callback)
+        return callback
+
+    def disconnect(self, callback):
+        super().disconnect(callback)
+        if callback in self.bare_callbacks:
+            self.bare_callbacks.remove(callback)
+
+    def notify(self):
+        if (self.callbacks or self.bare_callbacks) and not self.queued:
+            self.queued = True
+            pending.append(self)
+
+    def fire(self):
+        self.queued = False
+        key = self.owner.get_change_key()
+        if key == self.last_key:
+            return
+        self.last_key = key
+        if self.callbacks:
+            self.emit(self.owner.get_value())
+        for callback in self.bare_callbacks[:]:
+            callback()
+
+
+class Binding:
+    # setter(transform(*values)) with the get_value() of every source, once
+    # when created and then at most once per frame after any of them
+    # changed, without transform the value of a single source or a tuple
+    def __init__(self, sources, setter, transform=None):
+        if not isinstance(sources, (list, tuple)):
+            sources = [sources]
+        self.sources = list(sources)
+        self.setter = setter
+        self.transform = transform
+        self.queued = False
+        self.bound = True
+
+        for source in self.sources:
+            source.on_change.connect(self.notify, with_value=False)
+        self.fire()
+
+    def notify(self):
+        if self.bound and not self.queued:
+            self.queued = True
+            pending.append(self)
+
+    def get_value(self):
+        values = [source.get_value() for source in self.sources]
+        if self.transform is not None:
+            return self.transform(*values)
+        if len(values) == 1:
+            return values[0]
+        return tuple(values)
+
+    def fire(self):
+        self.queued = False
+        if self.bound:
+            self.setter(self.get_value())
+
+    def unbind(self):
+        self.bound = False
+        for source in self.sources:
+            source.on_change.disconnect(self.notify)
+
+
+def bind(sources, setter, transform=None) -> Binding:
+    return Binding(sources, setter, transform)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import math
+
+
+class GridIndex:
+    # uniform grid over a container's local area, items are (x, y, w, h)
+    # rects given in priority order: on overlap the first item wins
+    def __init__(self, size, rects, cell_size=None):
+        self.width, self.height = size
+        self.rects = rects
+
+        if cell_size is None:
+            cell_size = self.pick_cell_size(rects)
+        self.cell_size = cell_size
+
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        for i, rect in enumerate(rects):
+            self.insert(i, rect)
+
+    def pick_cell_size(self, rects):
+        count = len(rects)
+        if count == 0:
+            return max(self.width, self.height, 1)
+
+        total_w = 0
+        total_h = 0
+        for x, y, w, h in rects:
+            total_w += w
+            total_h += h
+        cell_size = max(total_w / count, total_h / count, 4)
+
+        # keep the grid from growing far beyond the number of items
+        max_cells = 4 * count + 64
+        while (self.width / cell_size) * (self.height / cell_size) > max_cells:
+            cell_size *= 2
+
+        return cell_size
+
+    def insert(self, i, rect):
+        x, y, w, h = rect
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+
+        cell_size = self.cell_size
+        for cy in range(int(y0 // cell_size), math.ceil(y1 / cell_size)):
+            for cx in range(int(x0 // cell_size), math.ceil(x1 / cell_size)):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    self.cells[(cx, cy)] = [i]
+                else:
+                    cell.append(i)
+
+    def query(self, x, y) -> int | None:
+        cell = self.cells.get((int(x // self.cell_size), int(y // self.cell_size)))
+        if cell is None:
+            return None
+
+        for i in cell:
+            rx, ry, rw, rh = self.rects[i]
+            if rx <= x < rx + rw and ry <= y < ry + rh:
+                return i
+        return None
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import pygame
+
+
+# off by default, set_convert(True) after pygame.display.set_mode makes
+# component surfaces and cached text use the display pixel format
+convert_enabled = False
+
+
+def set_convert(enabled):
+    # surfaces already allocated are replaced on their next paint
+    global convert_enabled
+    convert_enabled = enabled
+
+
+def get_display() -> pygame.Surface | None:
+    if not convert_enabled:
+        return None
+    return pygame.display.get_surface()
+
+
+def is_opaque_color(color):
+    return len(color) == 3 or color[3] == 255
+
+
+def new_surface(size, opaque=False) -> pygame.Surface:
+    # opaque surfaces have no alpha channel, blitting them is a copy
+    # instead of a blend, only used once a display exists to match
+    display = get_display()
+    if display is None:
+        return pygame.Surface(size, pygame.SRCALPHA)
+    if opaque:
+        return pygame.Surface(size, 0, display)
+    return pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+
+
+def matches(surface: pygame.Surface, size, opaque=False):
+    if surface.get_size() != tuple(size):
+        return False
+    has_alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+    if get_display() is None:
+        return has_alpha
+    return has_alpha != opaque
+
+
+def convert(surface: pygame.Surface) -> pygame.Surface:
+    # for surfaces that are kept and blitted many times, such as text
+    if get_display() is None:
+        return surface
+    return surface.convert_alpha()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+
+class GapBuffer:
+    # list of characters with a movable gap at the edit position, inserts
+    # and deletes near the caret cost the size of the edit, not of the text
+    def __init__(self, text="", gap_size=64):
+        self.buffer: list[str] = list(text) + [""]*gap_size
+        self.gap_start = len(text)
+        self.gap_end = len(self.buffer)
+
+    def __len__(self):
+        return len(self.buffer) - (self.gap_end - self.gap_start)
+
+    def __str__(self):
+        return self.get_text()
+
+    def __deepcopy__(self, memo):
+        clone = GapBuffer.__new__(GapBuffer)
+        clone.buffer = self.buffer.copy()
+        clone.gap_start = self.gap_start
+        clone.gap_end = self.gap_end
+        return clone
+
+    def move_gap(self, pos):
+        buffer = self.buffer
+        if pos < self.gap_start:
+            n = self.gap_start - pos
+            buffer[self.gap_end-n:self.gap_end] = buffer[pos:self.gap_start]
+            self.gap_start -= n
+            self.gap_end -= n
+        elif pos > self.gap_start:
+            n = pos - self.gap_start
+            buffer[self.gap_start:self.gap_start+n] = buffer[self.gap_end:self.gap_end+n]
+            self.gap_start += n
+            self.gap_end += n
+
+    def grow(self, needed):
+        # double the buffer so repeated inserts stay amortized O(1)
+        extra = max(needed, len(self.buffer))
+        self.buffer[self.gap_end:self.gap_end] = [""]*extra
+        self.gap_end += extra
+
+    def insert(self, pos, text):
+        assert 0 <= pos <= len(self)
+        self.move_gap(pos)
+        n = len(text)
+        if n > self.gap_end - self.gap_start:
+            self.grow(n)
+        self.buffer[self.gap_start:self.gap_start+n] = text
+        self.gap_start += n
+
+    def delete(self, start, end):
+        # removes [start, end)
+        assert 0 <= start <= end <= len(self)
+        self.move_gap(start)
+        self.gap_end += end - start
+
+    def __getitem__(self, i):
+        return self.char_at(i)
+
+    def char_at(self, i):
+        if i >= self.gap_start:
+            i += self.gap_end - self.gap_start
+        return self.buffer[i]
+
+    def get_text(self, start=0, end=None):
+        if end is None:
+            end = len(self)
+        start = max(start, 0)
+        end = min(end, len(self))
+        if start >= end:
+            return ""
+
+        buffer = self.buffer
+        gap = self.gap_end - self.gap_start
+        if end <= self.gap_start:
+            return "".join(buffer[start:end])
+        if start >= self.gap_start:
+            return "".join(buffer[start+gap:end+gap])
+        return "".join(buffer[start:self.gap_start]) + "".join(buffer[self.gap_end:end+gap])
+
+    def set_text(self, text, gap_size=64):
+        self.buffer = list(text) + [""]*gap_size
+        self.gap_start = len(text)
+        self.gap_end = len(self.buffer)
+
+    def find_word_start(self, pos):
+        return find_word_start(self, pos)
+
+    def find_word_end(self, pos):
+        return find_word_end(self, pos)
+
+
+def is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+# text is a str or a GapBuffer
+
+def find_word_start(text, pos):
+    # start of the word before pos, skipping whitespace first
+    while pos > 0 and not is_word_char(text[pos-1]):
+        pos -= 1
+    while pos > 0 and is_word_char(text[pos-1]):
+        pos -= 1
+    return pos
+
+
+def find_word_end(text, pos):
+    length = len(text)
+    while pos < length and not is_word_char(text[pos]):
+        pos += 1
+    while pos < length and is_word_char(text[pos]):
+        pos += 1
+    return pos
@@ -0,0 +1,16 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+
+@pytest.fixture(scope="session")
+def screen():
+    # once per session, fonts in the shared cache do not survive
+    # pygame.quit
+    pygame.init()
+    surface = pygame.display.set_mode((800, 600))
+    yield surface
+    pygame.quit()
@@ -0,0 +1,89 @@
+import pygame
+
+from pylame.components import Button, LameUI, ScrollPanel
+
+
+def click(lameui, pos):
+    lameui.handle_events([pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=pygame.BUTTON_LEFT, pos=pos)])
+
+
+def test_assigned_on_press_gets_only_the_button(screen):
+    lameui = LameUI((800, 600), (0, 0))
+    button = Button((100, 40), (10, 10), text="ok")
+    lameui.add(button)
+    lameui.draw_to(screen)
+
+    presses = []
+    button.on_press = lambda mouse_button: presses.append(mouse_button)
+    click(lameui, (50, 30))
+    assert presses == [pygame.BUTTON_LEFT]
+
+
+def test_on_press_override_gets_only_the_button(screen):
+    presses = []
+
+    class CountingButton(Button):
+        def on_press(self, button):
+            presses.append(button)
+            super().on_press(button)
+
+    lameui = LameUI((800, 600), (0, 0))
+    lameui.add(CountingButton((100, 40), (10, 10), text="ok"))
+    lameui.draw_to(screen)
+
+    click(lameui, (50, 30))
+    assert presses == [pygame.BUTTON_LEFT]
+    assert lameui.press_pos is None
+
+
+def make_scroll_panel(rows=100):
+    def make_row(size):
+        return Button(size, (0, 0), (55, 55, 55), font_size=12)
+
+    def bind_row(row, item, index):
+        row.text.set_text(item)
+
+    return ScrollPanel((300, 300), (0, 0), 30, make_row, bind_row,
+                       data=[f"row {i}" for i in range(rows)])
+
+
+def test_hover_follows_the_layout_after_a_scroll(screen, monkeypatch):
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: (50, 45))
+    lameui = LameUI((800, 600), (0, 0))
+    scroll_panel = make_scroll_panel()
+    lameui.add(scroll_panel)
+
+    # the rows under the pointer only exist once laid out
+    lameui.step(screen)
+    assert lameui.hovered_component is scroll_panel.rows[1]
+
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1))
+    lameui.step(screen)
+    row = scroll_panel.rows[4]
+    assert lameui.hovered_component is row
+    assert [r.text.text for r in scroll_panel.rows.values() if r.hovered] == ["row 4"]
+    assert lameui.get_idle_timeout(pygame.time.get_ticks()) is None
+
+
+def test_recycled_rows_are_not_left_hovered_or_selected(screen, monkeypatch):
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: (50, 45))
+    lameui = LameUI((800, 600), (0, 0))
+    scroll_panel = make_scroll_panel()
+    lameui.add(scroll_panel)
+    lameui.process_mouse_pos()
+    click(lameui, (50, 45))
+    row = scroll_panel.rows[1]
+    assert row.hovered
+    assert lameui.selected_component is row
+
+    # every visible row goes back to the pool and is bound again
+    scroll_panel.scroll_to(900)
+    lameui.draw_to(screen)
+    assert not any(r.hovered for r in scroll_panel.rows.values())
+    assert lameui.hovered_component is None
+    assert lameui.selected_component is None
+
+    lameui.process_mouse_pos()
+    assert lameui.hovered_component is scroll_panel.rows[31]
+    assert scroll_panel.rows[31].hovered
@@ -0,0 +1,48 @@
+from pylame.components import Button, LameUI, Panel
+
+
+def build_nested(depth=5, children=2):
+    lameui = LameUI((800, 600), (0, 0), bg_color=(22, 22, 22), name="root")
+    parent = lameui
+    path = [lameui]
+    for d in range(depth):
+        panel = Panel((700 - d*60, 500 - d*60), (0, 0), (40, 40, 40), name=f"panel{d}")
+        for i in range(children):
+            button = Button((40, 20), (0, 0), (100, 100, 100), name=f"button{d}.{i}", text=str(i))
+            # the profiler counts per class and name
+            button.text.name = f"text{d}.{i}"
+            panel.add(button)
+        parent.add(panel)
+        path.append(panel)
+        parent = panel
+    return lameui, path
+
+
+def get_components(comp):
+    yield comp
+    for child in getattr(comp, "components", ()):
+        yield from get_components(child)
+
+
+def test_redraws_on_nested_tree(screen):
+    lameui, path = build_nested()
+    profiler = lameui.enable_profiling()
+    components = list(get_components(lameui))
+
+    lameui.draw_to(screen)
+    redraws = profiler.get_counts("redraw")
+    assert sum(redraws.values()) == len(components)
+    assert set(redraws.values()) == {1}
+
+    lameui.draw_to(screen)
+    assert profiler.get_counts("redraw") == {}
+
+    leaf = path[-1].components[-1]
+    leaf.text.set_text("changed")
+    lameui.draw_to(screen)
+    redraws = profiler.get_counts("redraw")
+    changed = [leaf.text, leaf] + path[::-1]
+    assert sum(redraws.values()) == len(changed)
+    for comp in changed:
+        assert redraws[f"{type(comp).__name__}:{comp.name}"] == 1
+    lameui.disable_profiling()
@@ -0,0 +1,15 @@
+import pytest
+
+from pylame.loader import Template
+
+
+@pytest.mark.parametrize("description, message", [
+    ([], "expected an object"),
+    ({"type": "Nope"}, "unknown component type"),
+    ({"type": "Panel", "size": [10, 10], "direction": "diagonal"}, "unknown direction"),
+    ({"type": "Panel", "size": [10, 10], "align": "left"}, "unknown alignment"),
+    ({"type": "Button", "size": [10, 10], "children": [{"type": "Text", "text": "x"}]}, "can not have children"),
+])
+def test_parse_rejects_invalid_descriptions(description, message):
+    with pytest.raises(ValueError, match=message):
+        Template.parse(description)
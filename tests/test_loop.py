@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pygame
+
+from pylame.components import LameUI, Panel, Slider
+
+
+def test_step_caps_frames_while_idle(screen):
+    lameui = LameUI((800, 600), (0, 0), bg_color=(22, 22, 22))
+    lameui.step(screen)
+    assert lameui.get_idle_timeout(pygame.time.get_ticks()) is None
+
+    frames = []
+    lameui.subscribe(pygame.MOUSEMOTION, lambda event: frames.append(len(frames)) or True)
+
+    running = True
+
+    def post_motion():
+        while running:
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEMOTION, pos=(10, 10), rel=(1, 0), buttons=(0, 0, 0)))
+            time.sleep(0.001)
+
+    poster = threading.Thread(target=post_motion)
+    poster.start()
+    try:
+        steps = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < 0.5:
+            lameui.step(screen, max_fps=60)
+            steps += 1
+    finally:
+        running = False
+        poster.join()
+        pygame.event.clear()
+
+    # 30 frames at 60 fps, with slack for timer granularity
+    assert steps <= 36
+    # motion is coalesced to one event per frame
+    assert len(frames) <= steps
+
+
+def test_process_overrides_are_called_every_frame(screen):
+    ticks = []
+
+    class TickingSlider(Slider):
+        def process(self, dt):
+            ticks.append((self.name, dt))
+
+    class TickingPanel(Panel):
+        def process(self, dt):
+            ticks.append((self.name, dt))
+            super().process(dt)
+
+    lameui = LameUI((800, 600), (0, 0))
+    lameui.add(TickingSlider((100, 20), (0, 0), name="direct"))
+    # attached after its children were added
+    panel = Panel((200, 200), (0, 100))
+    panel.add(TickingSlider((100, 20), (0, 0), name="nested"))
+    lameui.add(panel)
+    ticking_panel = TickingPanel((200, 200), (300, 100), name="panel")
+    lameui.add(ticking_panel)
+    ticking_panel.add(TickingSlider((100, 20), (0, 0), name="child"))
+
+    for _ in range(5):
+        lameui.process(16)
+    assert sorted(ticks) == sorted([("direct", 16), ("nested", 16), ("panel", 16), ("child", 16)]*5)
+    assert lameui.get_idle_timeout(pygame.time.get_ticks()) == 0
+
+    ticks.clear()
+    lameui.clone().process(16)
+    assert sorted(ticks) == sorted([("direct", 16), ("nested", 16), ("panel", 16), ("child", 16)])
@@ -0,0 +1,17 @@
+from pylame.components import LameUI, Text
+from pylame.fonts import text_cache
+
+
+def test_text_cache_hits_are_not_counted_as_renders(screen):
+    text_cache.clear()
+    lameui = LameUI((800, 600), (0, 0))
+    profiler = lameui.enable_profiling()
+    lameui.add(Text("same", 20))
+    lameui.add(Text("same", 20))
+    lameui.add(Text("same", 20))
+    counts = profiler.current_counts
+    renders = sum(n for (kind, _, _), n in counts.items() if kind == "text_render")
+    hits = sum(n for (kind, _, _), n in counts.items() if kind == "text_cache_hit")
+    assert renders == 1
+    assert hits == 2
+    lameui.disable_profiling()
@@ -0,0 +1,83 @@
+import pygame
+
+from pylame.components import LameUI, Slider, TextInput
+from pylame.signals import bind
+
+
+def test_text_input_joins_text_only_when_emitting(screen):
+    lameui = LameUI((800, 600), (0, 0))
+    text_input = TextInput((400, 30), (0, 0), text="x"*100_000)
+    lameui.add(text_input)
+    changes = []
+    text_input.on_change.connect(changes.append)
+
+    joins = []
+    get_text = text_input.buffer.get_text
+
+    def counting_get_text(*args):
+        joins.append(args)
+        return get_text(*args)
+    text_input.buffer.get_text = counting_get_text
+
+    for _ in range(50):
+        text_input.insert("a")
+    full_joins = [args for args in joins if not args]
+    assert full_joins == []
+
+    lameui.draw_to(screen)
+    assert len(changes) == 1
+    assert changes[0] == "x"*100_000 + "a"*50
+
+
+def test_bind_calls_setter_once_per_frame(screen):
+    lameui = LameUI((800, 600), (0, 0))
+    sliders = [Slider((200, 20), (0, 0), min_value=0, max_value=255, start_value=v) for v in (1, 2, 3)]
+    for slider in sliders:
+        lameui.add(slider)
+    colors = []
+    bind(sliders, colors.append, lambda r, g, b: (r, g, b))
+    assert colors == [(1, 2, 3)]
+
+    sliders[0].set_value(10)
+    sliders[1].set_value(20)
+    lameui.draw_to(screen)
+    assert colors == [(1, 2, 3), (10, 20, 3)]
+
+
+def test_bare_callbacks_skip_building_the_value(screen):
+    lameui = LameUI((800, 600), (0, 0))
+    text_input = TextInput((400, 30), (0, 0), text="x"*1000)
+    lameui.add(text_input)
+    calls = []
+    text_input.on_change.connect(lambda: calls.append(len(text_input.buffer)), with_value=False)
+
+    joins = []
+    get_text = text_input.buffer.get_text
+
+    def counting_get_text(*args):
+        if not args:
+            joins.append(args)
+        return get_text(*args)
+    text_input.buffer.get_text = counting_get_text
+
+    for _ in range(3):
+        text_input.insert("a")
+        lameui.draw_to(screen)
+    assert calls == [1001, 1002, 1003]
+    assert joins == []
+
+
+def test_changes_are_coalesced_per_frame(screen):
+    lameui = LameUI((800, 600), (0, 0))
+    slider = Slider((200, 20), (0, 0), min_value=0, max_value=100, start_value=0)
+    lameui.add(slider)
+    values = []
+    slider.on_change.connect(values.append)
+
+    # an event handler, the mouse pass and a timer all change the value
+    slider.set_value(10)
+    lameui.process_mouse_pos()
+    lameui.set_timer(0, lambda: slider.set_value(20))
+    lameui.process(0)
+    lameui.draw_to(screen)
+    assert values == [20.0]
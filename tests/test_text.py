@@ -0,0 +1,62 @@
+import pygame
+
+from pylame.components import LameUI, TextArea, TextInput
+
+
+def test_text_area_insert_drops_carriage_returns(screen):
+    text_area = TextArea((300, 200), (0, 0), text="ab")
+    text_area.set_caret(0, 1)
+    text_area.insert("x\r")
+    assert text_area.text == "axb"
+    assert text_area.caret == (0, 2)
+
+    text_area.insert("1\r\n2")
+    assert text_area.text == "ax1\n2b"
+
+
+def test_selection_is_shared_by_both_editors(screen):
+    text_input = TextInput((300, 30), (0, 0), text="hello world")
+    text_input.set_caret(6)
+    text_input.set_caret(11, extend=True)
+    assert text_input.get_selected_text() == "world"
+
+    text_area = TextArea((300, 200), (0, 0), text="hello\nworld")
+    text_area.set_caret(0, 3)
+    text_area.set_caret(1, 2, extend=True)
+    assert text_area.get_selection() == ((0, 3), (1, 2))
+    assert text_area.get_selected_text() == "lo\nwo"
+
+
+def test_press_places_the_caret_at_the_event_position(screen, monkeypatch):
+    # the pointer may have moved on since the press was queued
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: (0, 0))
+    lameui = LameUI((800, 600), (0, 0))
+    text_input = TextInput((300, 30), (0, 0), text="hello")
+    text_area = TextArea((300, 200), (0, 100), text="hello\nworld")
+    lameui.add(text_input)
+    lameui.add(text_area)
+    lameui.draw_to(screen)
+
+    lameui.on_mouse_press(pygame.BUTTON_LEFT, (299, 15))
+    assert text_input.caret == 5
+
+    lameui.on_mouse_press(pygame.BUTTON_LEFT, (299, 299))
+    assert text_area.caret == (1, 5)
+
+
+def test_assigning_text_sets_it(screen):
+    lameui = LameUI((800, 600), (0, 0))
+    text_input = TextInput((300, 30), (0, 0), text="hello")
+    lameui.add(text_input)
+    changes = []
+    text_input.on_change.connect(changes.append)
+
+    text_input.text = "bye"
+    assert text_input.text == "bye"
+    assert text_input.caret == 3
+    lameui.draw_to(screen)
+    assert changes == ["bye"]
+
+    text_area = TextArea((300, 200), (0, 100), text="a")
+    text_area.text = "b\nc"
+    assert text_area.text == "b\nc"